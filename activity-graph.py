@@ -11,42 +11,22 @@ up vertically.
 
 import sys
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-
 from graph_common import (
+    RenderManifest,
     add_gnu_release_markers,
     apply_smoothing,
+    cached_frame,
+    downsample,
+    parse_dates,
+    pyplot,
+    render_key,
+    save_figure,
+    seaborn,
     setup_theme,
     style_axes,
     style_legend,
 )
-
-if len(sys.argv) <= 1:
-    print("activity-graph.py: <json file>")
-    sys.exit()
-
-raw = pd.read_json(sys.argv[1], orient="index", convert_dates=False)
-
-# Flatten {"2021-01": {"gnu": {...}, "uutils": {...}}} into one row per
-# (month, project).
-rows = []
-for month, projects in raw.iterrows():
-    for project, values in projects.items():
-        rows.append(
-            {
-                "date": pd.to_datetime(month, format="%Y-%m", utc=True),
-                "project": project,
-                **{k: int(v) for k, v in values.items()},
-            }
-        )
-
-df = pd.DataFrame(rows).sort_values("date")
-
-print(df)
-
-setup_theme()
+from instrumentation import session, span
 
 palette = {
     "gnu": "#0066CC",
@@ -59,8 +39,10 @@ label_map = {
 }
 
 
-def plot_panel(ax, metric, ylabel, smooth=True):
+def plot_panel(ax, df, metric, ylabel, smooth=True):
     """Plot one metric for both projects on `ax`."""
+    sns = seaborn()
+
     data = df[["date", "project", metric]].copy()
     if smooth:
         # 3-month rolling mean: monthly counts are spiky (release crunches,
@@ -68,21 +50,23 @@ def plot_panel(ax, metric, ylabel, smooth=True):
         data["value"] = apply_smoothing(data, "project", metric, window=3)
     else:
         data["value"] = data[metric]
-
-    sns.lineplot(
-        data=data,
-        x="date",
-        y="value",
-        hue="project",
-        palette=palette,
-        hue_order=["gnu", "uutils"],
-        linewidth=3,
-        ax=ax,
-        markers=False,
-        dashes=False,
-        alpha=1,
-        zorder=3,
-    )
+    data = downsample(data, "date", "value", "project")
+
+    with span("lineplot"):
+        sns.lineplot(
+            data=data,
+            x="date",
+            y="value",
+            hue="project",
+            palette=palette,
+            hue_order=["gnu", "uutils"],
+            linewidth=3,
+            ax=ax,
+            markers=False,
+            dashes=False,
+            alpha=1,
+            zorder=3,
+        )
     style_axes(ax, xlabel="Date", ylabel=ylabel)
 
     y_max = data["value"].max()
@@ -93,50 +77,91 @@ def plot_panel(ax, metric, ylabel, smooth=True):
     style_legend(ax, handles, labels, ncol=2, loc="upper left")
 
 
-fig, (ax_top, ax_mid, ax_bot) = plt.subplots(
-    3, 1, figsize=(18, 20), dpi=100, sharex=True
-)
+def parse(path):
+    import pandas as pd
 
-plot_panel(ax_top, "commits", "Commits / month")
-plot_panel(ax_mid, "authors", "Active contributors / month")
-plot_panel(ax_bot, "cumulative_authors", "Distinct contributors (since day 1)", False)
+    raw = pd.read_json(path, orient="index", convert_axes=False, convert_dates=False)
 
-fig.suptitle(
-    "GNU vs uutils coreutils — Development Activity Since 2021",
-    fontsize=26,
-    fontweight="bold",
-    color="#1a1a1a",
-    y=0.995,
-)
-fig.text(
-    0.5,
-    0.972,
-    "Non-merge commits, bots excluded. Top two panels are 3-month rolling averages; "
-    "the cumulative panel counts every contributor since each project's first commit.",
-    ha="center",
-    va="top",
-    fontsize=13,
-    color="#6B7280",
-    style="italic",
-    alpha=0.9,
-)
+    # Flatten {"2021-01": {"gnu": {...}, "uutils": {...}}} into one row per
+    # (month, project).
+    rows = []
+    for month, projects in raw.iterrows():
+        for project, values in projects.items():
+            rows.append(
+                {
+                    "date": month,
+                    "project": project,
+                    **{k: int(v) for k, v in values.items()},
+                }
+            )
 
-# Hide the upper panels' x-tick labels — they duplicate the bottom panel's.
-for ax in (ax_top, ax_mid):
-    plt.setp(ax.get_xticklabels(), visible=False)
-    ax.set_xlabel("")
-
-plt.tight_layout(rect=[0, 0, 1, 0.96])
-
-plt.savefig(
-    "activity-results.svg",
-    format="svg",
-    dpi=300,
-    bbox_inches="tight",
-    facecolor="white",
-    edgecolor="none",
-    metadata={
-        "Creator": "uutils coreutils tracking",
-        "Title": "Development Activity Evolution",
-    },
-)
+    df = pd.DataFrame(rows)
+    df["date"] = parse_dates(df["date"])
+    return df.sort_values("date")
+
+
+def main(argv: list[str]) -> int:
+    if not argv:
+        print("activity-graph.py: <json file>")
+        return 0
+
+    df = cached_frame(argv[0], parse)
+
+    print(df)
+
+    output = "activity-results.svg"
+    manifest = RenderManifest()
+    key = render_key(__file__, df)
+    if manifest.is_current(output, key):
+        print(f"{output} is up to date")
+        return 0
+
+    plt = pyplot()
+    setup_theme()
+
+    fig, (ax_top, ax_mid, ax_bot) = plt.subplots(
+        3, 1, figsize=(18, 20), dpi=100, sharex=True
+    )
+
+    plot_panel(ax_top, df, "commits", "Commits / month")
+    plot_panel(ax_mid, df, "authors", "Active contributors / month")
+    plot_panel(
+        ax_bot, df, "cumulative_authors", "Distinct contributors (since day 1)", False
+    )
+
+    fig.suptitle(
+        "GNU vs uutils coreutils — Development Activity Since 2021",
+        fontsize=26,
+        fontweight="bold",
+        color="#1a1a1a",
+        y=0.995,
+    )
+    fig.text(
+        0.5,
+        0.972,
+        "Non-merge commits, bots excluded. Top two panels are 3-month rolling averages; "
+        "the cumulative panel counts every contributor since each project's first commit.",
+        ha="center",
+        va="top",
+        fontsize=13,
+        color="#6B7280",
+        style="italic",
+        alpha=0.9,
+    )
+
+    # Hide the upper panels' x-tick labels — they duplicate the bottom panel's.
+    for ax in (ax_top, ax_mid):
+        plt.setp(ax.get_xticklabels(), visible=False)
+        ax.set_xlabel("")
+
+    plt.tight_layout(rect=[0, 0, 1, 0.96])
+
+    save_figure(fig, output, "Development Activity Evolution")
+    manifest.record(output, key)
+    manifest.save()
+    return 0
+
+
+if __name__ == "__main__":
+    with session("activity-graph"):
+        sys.exit(main(sys.argv[1:]))
@@ -20,33 +20,104 @@ The result is a JSON object keyed by month (`YYYY-MM`), each holding one
 entry per project:
 
   {"2021-01": {"gnu": {"commits": "42", ...}, "uutils": {...}}, ...}
+
+More projects can be added with `--repo NAME=PATH`; all repositories are
+walked concurrently.
+
+With `--checkpoint`, the per-month commit counts and (hashed) author sets are
+kept in a JSON file together with the last commit walked for each project, so
+a later run only walks `last..HEAD`. The checkpoint covers every commit up to
+that revision: a commit committed after `--until` but authored in a reported
+month counts right away instead of once `--until` has moved past it. A
+rewritten history or a changed `.mailmap` makes that project start over.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import subprocess
 import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
 
+from instrumentation import add_arguments, session, span
+
 BOT_PATTERNS = [
-    re.compile(r"\[bot\]"),
-    re.compile(r"\bdependabot\b"),
-    re.compile(r"\brenovate\b"),
-    re.compile(r"github-actions"),
-    re.compile(r"^actions@github\.com$"),
+    r"\[bot\]",
+    r"\bdependabot\b",
+    r"\brenovate\b",
+    r"github-actions",
+    r"^actions@github\.com$",
 ]
+BOT_PATTERN = re.compile("|".join(f"(?:{p})" for p in BOT_PATTERNS))
 
 
 def is_bot(email: str, name: str) -> bool:
-    haystack = f"{email} {name}".lower()
-    return any(p.search(haystack) for p in BOT_PATTERNS)
+    return BOT_PATTERN.search(f"{email} {name}".lower()) is not None
+
+
+def author_key(email: str) -> str:
+    """Compact, case-insensitive identity for an author email."""
+    return hashlib.blake2b(email.lower().encode(), digest_size=8).hexdigest()
+
+
+class Identities:
+    """Resolve `(email, name)` pairs from the log to author keys.
+
+    A few thousand identities repeat over hundreds of thousands of commits,
+    so each pair is classified and hashed once. Bots resolve to None.
+    """
+
+    def __init__(self):
+        self.keys: dict[tuple[str, str], str | None] = {}
+
+    def resolve(self, email: str, name: str) -> str | None:
+        try:
+            return self.keys[email, name]
+        except KeyError:
+            key = None if is_bot(email, name) else author_key(email)
+            self.keys[email, name] = key
+            return key
+
+
+# Shared by every walk, so the monthly and cumulative author sets of all
+# projects are built from the same resolved keys.
+IDENTITIES = Identities()
 
 
 def git(repo: str, *args: str) -> str:
     return subprocess.check_output(["git", "-C", repo, *args], text=True)
 
 
+def iter_log(repo: str, *args: str) -> Iterator[str]:
+    """Yield the records of `git log -z ...` as git produces them.
+
+    The log is read from a pipe in fixed-size chunks instead of being
+    buffered whole, so memory stays flat however long the history is.
+    """
+    proc = subprocess.Popen(
+        ["git", "-C", repo, "log", "-z", *args], stdout=subprocess.PIPE
+    )
+    pending = b""
+    while True:
+        # Mostly waiting for git; the rest of walk() is folding the records.
+        with span("git log"):
+            chunk = proc.stdout.read(1 << 16)
+        if not chunk:
+            break
+        *records, pending = (pending + chunk).split(b"\0")
+        for record in records:
+            yield record.decode("utf-8", errors="replace")
+    if pending:
+        yield pending.decode("utf-8", errors="replace")
+    proc.stdout.close()
+    if proc.wait():
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+
 def month_range(since: str, until: str) -> list[str]:
     """All `YYYY-MM` keys from `since` up to `until` (exclusive)."""
     start = date.fromisoformat(f"{since[:7]}-01")
@@ -63,34 +134,145 @@ def month_range(since: str, until: str) -> list[str]:
     return months
 
 
-def collect(repo: str, since: str, until: str, rev: str) -> dict[str, dict[str, str]]:
-    """Per-month commit/author counts for `repo` in [since, until).
+@span("walk")
+def walk(repo: str, *args: str, per_month: dict | None = None) -> dict[str, dict]:
+    """Fold `git log <args>` into `{month: {"commits": n, "authors": {key}}}`.
 
-    Only the reported months are limited by `since`: the whole history up to
-    `until` is walked, so `cumulative_authors` counts every contributor the
-    project ever had, not just those since `since`.
+    Buckets are added to `per_month` when given, so a walk over new commits
+    can extend the counts of an earlier one.
     """
-    log = git(
+    log = iter_log(
         repo,
-        "log",
-        rev,
+        *args,
         "--no-merges",
         "--use-mailmap",
-        f"--until={until}",
         "--date=format-local:%Y-%m",
         "--pretty=format:%ad\x1f%aE\x1f%aN",
     )
 
-    per_month: dict[str, dict] = {}
-    for line in log.splitlines():
-        if not line.strip():
+    if per_month is None:
+        per_month = {}
+    for record in log:
+        if not record.strip():
             continue
-        month, email, name = line.split("\x1f")
-        if is_bot(email, name):
+        month, email, name = record.split("\x1f")
+        key = IDENTITIES.resolve(email, name)
+        if key is None:
             continue
         bucket = per_month.setdefault(month, {"commits": 0, "authors": set()})
         bucket["commits"] += 1
-        bucket["authors"].add(email.lower())
+        bucket["authors"].add(key)
+    return per_month
+
+
+class Checkpoint:
+    """Per-project walk state carried between runs in a JSON file.
+
+    For each project we keep the last commit walked, a fingerprint of the
+    `.mailmap` the authors were resolved with, and per month the commit count
+    and the set of hashed author emails, one month per line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.projects: dict[str, dict] = {}
+        if os.path.exists(path):
+            with span("checkpoint load"), open(path) as f:
+                self.projects = json.load(f)
+
+    def update(self, name: str, repo: str, rev: str) -> dict[str, dict]:
+        """Walk `name`'s commits since the checkpoint up to `rev`.
+
+        Returns the per-month buckets for the whole history, as `walk` does.
+        """
+        head = git(repo, "rev-parse", rev).strip()
+        mailmap = mailmap_fingerprint(repo)
+        state = self.projects.get(name)
+
+        if (
+            state
+            and state["mailmap"] == mailmap
+            and is_ancestor(repo, state["head"], head)
+        ):
+            per_month = {
+                month: {"commits": bucket["commits"], "authors": set(bucket["authors"])}
+                for month, bucket in state["months"].items()
+            }
+            if state["head"] != head:
+                walk(repo, f"{state['head']}..{head}", per_month=per_month)
+        else:
+            per_month = walk(repo, head)
+
+        self.projects[name] = {
+            "head": head,
+            "mailmap": mailmap,
+            "months": {
+                month: {
+                    "commits": bucket["commits"],
+                    "authors": sorted(bucket["authors"]),
+                }
+                for month, bucket in sorted(per_month.items())
+            },
+        }
+        return per_month
+
+    @span("checkpoint save")
+    def save(self) -> None:
+        blocks = []
+        for name, state in sorted(self.projects.items()):
+            months = ",\n".join(
+                f"      {json.dumps(month)}: {json.dumps(bucket)}"
+                for month, bucket in state["months"].items()
+            )
+            blocks.append(
+                f"  {json.dumps(name)}: {{\n"
+                f'    "head": {json.dumps(state["head"])},\n'
+                f'    "mailmap": {json.dumps(state["mailmap"])},\n'
+                f'    "months": {{\n{months}\n    }}\n'
+                "  }"
+            )
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            f.write("{\n" + ",\n".join(blocks) + "\n}\n")
+        os.replace(tmp, self.path)
+
+
+def mailmap_fingerprint(repo: str) -> str | None:
+    path = os.path.join(repo, ".mailmap")
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def is_ancestor(repo: str, ancestor: str, rev: str) -> bool:
+    check = subprocess.run(
+        ["git", "-C", repo, "merge-base", "--is-ancestor", ancestor, rev],
+        capture_output=True,
+        check=False,
+    )
+    return check.returncode == 0
+
+
+def collect(
+    repo: str,
+    since: str,
+    until: str,
+    rev: str,
+    checkpoint: Checkpoint | None = None,
+    name: str | None = None,
+) -> dict[str, dict[str, str]]:
+    """Per-month commit/author counts for `repo` in [since, until).
+
+    Only the reported months are limited by `since`: the whole history up to
+    `until` is walked, so `cumulative_authors` counts every contributor the
+    project ever had, not just those since `since`. With a `checkpoint`, only
+    the commits since `name`'s last run are walked.
+    """
+    if checkpoint is None:
+        per_month = walk(repo, rev, f"--until={until}")
+    else:
+        per_month = checkpoint.update(name, repo, rev)
 
     result = {}
     seen: set[str] = set()
@@ -126,6 +308,19 @@ def main() -> int:
     )
     parser.add_argument("--gnu-rev", default="HEAD", help="GNU revision to walk")
     parser.add_argument("--uutils-rev", default="HEAD", help="uutils revision to walk")
+    parser.add_argument(
+        "--repo",
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="another git checkout to report next to gnu and uutils (repeatable)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="JSON file to resume from and update, so only new commits are walked",
+    )
+    add_arguments(parser)
     args = parser.parse_args()
 
     # Default to the start of the current month: the running month is always
@@ -134,15 +329,38 @@ def main() -> int:
         today = datetime.now(timezone.utc).date()
         args.until = date(today.year, today.month, 1).isoformat()
 
-    gnu = collect(args.gnu, args.since, args.until, args.gnu_rev)
-    uutils = collect(args.uutils, args.since, args.until, args.uutils_rev)
-
-    merged = {
-        month: {"gnu": gnu[month], "uutils": uutils[month]} for month in sorted(gnu)
+    projects = {
+        "gnu": (args.gnu, args.gnu_rev),
+        "uutils": (args.uutils, args.uutils_rev),
     }
-    json.dump(merged, sys.stdout, indent=2)
-    sys.stdout.write("\n")
-    return 0
+    for spec in args.repo:
+        name, sep, path = spec.partition("=")
+        if not sep or not name or not path or name in projects:
+            parser.error(f"--repo: expected a new NAME=PATH, got {spec!r}")
+        projects[name] = (path, "HEAD")
+
+    with session("activity_count", args.profile, args.timings):
+        # Each collect() mostly waits on its own `git log`, so walking all the
+        # repositories at once takes about as long as the slowest one.
+        checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+        with ThreadPoolExecutor(max_workers=len(projects)) as pool:
+            futures = {
+                name: pool.submit(
+                    collect, repo, args.since, args.until, rev, checkpoint, name
+                )
+                for name, (repo, rev) in projects.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        if checkpoint:
+            checkpoint.save()
+
+        merged = {
+            month: {name: result[month] for name, result in results.items()}
+            for month in sorted(results["gnu"])
+        }
+        json.dump(merged, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
 
 
 if __name__ == "__main__":
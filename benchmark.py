@@ -0,0 +1,491 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Benchmarks for the tracking scripts.
+
+Suites:
+
+  startup    how long the graph scripts take to start and exit when they have
+             nothing to draw, either because they got no arguments or because
+             their graph is up to date. Each case runs under
+             `python -X importtime`, which also tells how much of that is spent
+             importing and whether pandas, matplotlib.pyplot or seaborn got
+             loaded at all.
+  count      unsafe_count.count_at and count_incremental on a synthetic
+             repository
+  activity   activity_count.collect on the same repository
+  load       reading the result files, without and with their frame cache
+  smoothing  apply_smoothing on the test-suite series
+  render     each graph of render_graphs.py, drawn from scratch
+
+The synthetic repository is made with `git fast-import`, so no network is
+needed; --commits, --authors and --files set its size. The other cases run in
+a scratch copy of the repository's scripts and data, plus a small synthetic
+individual-size-result.json.
+
+--json saves the results; --compare reads such a file back as the baseline,
+prints how every case changed, and exits with 1 if one got slower than
+--tolerance times its baseline.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# Modules whose import time the startup benchmark reports separately.
+HEAVY_MODULES = ("pandas", "matplotlib.pyplot", "seaborn")
+
+SUITES = ["startup", "count", "activity", "load", "smoothing", "render"]
+
+# (name, script, arguments). The "up to date" cases are rendered once first.
+STARTUP_CASES = [
+    ("graph.py usage", "graph.py", []),
+    ("unsafe-graph.py usage", "unsafe-graph.py", []),
+    ("graph.py GNU up to date", "graph.py", ["gnu-result.json", "GNU"]),
+    ("size-graph.py up to date", "size-graph.py", ["size-result.json"]),
+    ("unsafe-graph.py up to date", "unsafe-graph.py", ["unsafe-result.json"]),
+    ("activity-graph.py up to date", "activity-graph.py", ["activity-result.json"]),
+]
+
+
+# Lines of a synthetic `.rs` file, with how often each one comes up.
+RUST_LINES = [
+    ("    let value = input.len();\n", 60),
+    ("    if value > 0 {\n        return Ok(value);\n    }\n", 20),
+    ("    // SAFETY: the descriptor stays open for the whole call\n", 5),
+    ("    let n = unsafe { libc::read(fd, buf.as_mut_ptr().cast(), buf.len()) };\n", 4),
+    ("unsafe fn raw_len(ptr: *const u8) -> usize {\n    0\n}\n", 1),
+    ("unsafe impl Send for Handle {}\n", 1),
+    ("#[unsafe(no_mangle)]\n", 1),
+]
+
+# Bots, which activity_count leaves out, among the synthetic authors.
+BOT_AUTHORS = [
+    ("dependabot[bot]", "49699333+dependabot[bot]@users.noreply.github.com"),
+    ("renovate[bot]", "29139614+renovate[bot]@users.noreply.github.com"),
+]
+
+
+def scratch_copy(directory):
+    """Copy the scripts and result files into `directory`."""
+    for path in [*HERE.glob("*.py"), *HERE.glob("*-result.json")]:
+        shutil.copy(path, directory)
+
+
+def rust_source(rng, lines):
+    texts, weights = zip(*RUST_LINES, strict=True)
+    body = "".join(rng.choices(texts, weights, k=lines))
+    return f"fn main() {{\n{body}}}\n".encode()
+
+
+def make_repo(directory, commits, authors, files, seed=0):
+    """Create a git repository with a synthetic history in `directory`.
+
+    `commits` commits spread over five years, by `authors` people and a
+    couple of bots, over `files` `.rs` files (a fifth of them tests): the
+    first commit adds every file and each later one rewrites three of them.
+    """
+    rng = random.Random(seed)
+    people = [(f"Author {i}", f"author{i}@example.org") for i in range(authors)]
+    people += BOT_AUTHORS
+    paths = [
+        f"tests/by-util/test_u{i}.rs" if i % 5 == 0 else f"src/uu/u{i % 50}/f{i}.rs"
+        for i in range(files)
+    ]
+    start = 1609459200  # 2021-01-01
+    step = 5 * 365 * 86400 // max(commits, 1)
+    stream = []
+    for i in range(commits):
+        name, email = rng.choice(people)
+        when = start + i * step
+        message = f"commit {i}\n".encode()
+        stream.append(
+            f"commit refs/heads/main\n"
+            f"author {name} <{email}> {when} +0000\n"
+            f"committer {name} <{email}> {when} +0000\n"
+            f"data {len(message)}\n".encode()
+            + message
+        )
+        for path in paths if i == 0 else rng.sample(paths, min(3, len(paths))):
+            data = rust_source(rng, rng.randint(20, 200))
+            stream.append(f"M 644 inline {path}\ndata {len(data)}\n".encode() + data)
+        stream.append(b"\n")
+    subprocess.run(["git", "init", "-q", "-b", "main", directory], check=True)
+    subprocess.run(
+        ["git", "-C", directory, "fast-import", "--quiet"],
+        input=b"".join(stream),
+        check=True,
+    )
+
+
+def make_individual_sizes(path, dates, utilities=4, seed=0):
+    """Write an individual-size-result.json with a few utilities over `dates`."""
+    rng = random.Random(seed)
+    sizes = {f"util{i}": rng.randint(500, 3000) for i in range(utilities)}
+    results = {}
+    for date in dates:
+        for name in sizes:
+            sizes[name] += rng.choice([0, 0, 0, 1, -1, 20])
+        results[date] = {"sha": f"{rng.getrandbits(160):040x}", "sizes": dict(sizes)}
+    with open(path, "w") as f:
+        json.dump(results, f)
+
+
+def best_time(runs, run, setup=None):
+    """Best wall time of `runs` calls of `run`, each after `setup` if given.
+
+    One more call comes first, untimed, so that imports and other one-time
+    costs do not count.
+    """
+    times = []
+    for i in range(runs + 1):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        if i:
+            times.append(time.perf_counter() - start)
+    return {"seconds": round(min(times), 4)}
+
+
+def report(name, result):
+    print(f"{name:40} {result['seconds'] * 1000:9.1f}ms")
+
+
+def parse_importtime(stderr):
+    """Total import time and per-module cumulative times, in seconds.
+
+    `python -X importtime` prints "import time: self | cumulative | name"
+    per module, nested imports indented under the one that caused them.
+    """
+    total = 0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        seconds = int(cumulative) / 1e6
+        modules[name.strip()] = seconds
+        if not name[1:].startswith(" "):
+            total += seconds
+    return total, modules
+
+
+def run_startup_case(directory, script, args, runs):
+    """Best wall and import time of `runs` runs of one script."""
+    command = [sys.executable, "-X", "importtime", script, *args]
+    wall = []
+    imports = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        done = subprocess.run(
+            command, cwd=directory, capture_output=True, text=True, check=True
+        )
+        wall.append(time.perf_counter() - start)
+        imports.append(parse_importtime(done.stderr))
+    total, modules = min(imports, key=lambda result: result[0])
+    return {
+        "wall_s": round(min(wall), 4),
+        "imports_s": round(total, 4),
+        "heavy_imports": {
+            name: round(modules[name], 4) for name in HEAVY_MODULES if name in modules
+        },
+    }
+
+
+def startup(runs):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        scratch_copy(directory)
+        for _, script, args in STARTUP_CASES:
+            if args:
+                # Draw the graph once, so the timed runs find it up to date.
+                subprocess.run(
+                    [sys.executable, script, *args],
+                    cwd=directory,
+                    capture_output=True,
+                    check=True,
+                )
+        for name, script, args in STARTUP_CASES:
+            results[name] = run_startup_case(directory, script, args, runs)
+            result = results[name]
+            heavy = ", ".join(result["heavy_imports"]) or "none"
+            print(
+                f"{name:32} {result['wall_s'] * 1000:7.0f}ms wall "
+                f"{result['imports_s'] * 1000:7.0f}ms imports  (heavy: {heavy})"
+            )
+    return results
+
+
+def count(repo, runs):
+    import unsafe_count
+
+    head = unsafe_count.git(repo, "rev-parse", "HEAD").strip()
+    depth = min(50, int(unsafe_count.git(repo, "rev-list", "--count", "HEAD")) - 1)
+    base = unsafe_count.git(repo, "rev-parse", f"HEAD~{depth}").strip()
+    warm = unsafe_count.BlobCache()
+    base_counts = unsafe_count.count_at(repo, base, warm)
+    unsafe_count.count_at(repo, head, warm)
+    cases = {
+        "count_at, empty blob cache": lambda: unsafe_count.count_at(repo, head),
+        "count_at, warm blob cache": lambda: unsafe_count.count_at(repo, head, warm),
+        f"count_incremental, {depth} commits": lambda: unsafe_count.count_incremental(
+            repo, base, base_counts, head
+        ),
+    }
+    results = {}
+    for name, run in cases.items():
+        results[name] = best_time(runs, run)
+        report(name, results[name])
+    return results
+
+
+def activity(repo, runs):
+    import activity_count
+
+    def reset():
+        # Start every run with no resolved authors, like a fresh process.
+        activity_count.IDENTITIES.keys.clear()
+
+    name = "collect"
+    results = {
+        name: best_time(
+            runs,
+            lambda: activity_count.collect(repo, "2021-01-01", "2026-01-01", "HEAD"),
+            reset,
+        )
+    }
+    report(name, results[name])
+    return results
+
+
+def load(runs):
+    from graph_common import cached_frame, load_individual_sizes, load_test_results
+    from render_graphs import load_script
+
+    activity_graph = load_script("activity-graph.py")
+    size_graph = load_script("size-graph.py")
+    unsafe_graph = load_script("unsafe-graph.py")
+    cases = [
+        ("gnu-result.json", lambda: load_test_results("gnu-result.json")),
+        (
+            "size-result.json",
+            lambda: cached_frame("size-result.json", size_graph.parse),
+        ),
+        (
+            "unsafe-result.json",
+            lambda: cached_frame("unsafe-result.json", unsafe_graph.parse),
+        ),
+        (
+            "activity-result.json",
+            lambda: cached_frame("activity-result.json", activity_graph.parse),
+        ),
+        (
+            "individual-size-result.json",
+            lambda: load_individual_sizes("individual-size-result.json"),
+        ),
+    ]
+    results = {}
+    for path, run in cases:
+        cache = Path(path).with_suffix(".cache.npz")
+        name = f"{path}, no cache"
+        results[name] = best_time(runs, run, partial(cache.unlink, missing_ok=True))
+        report(name, results[name])
+        name = f"{path}, cached"
+        results[name] = best_time(runs, run)
+        report(name, results[name])
+    return results
+
+
+def smoothing(runs):
+    import pandas as pd
+
+    from graph_common import apply_smoothing, load_test_results
+
+    df = load_test_results("gnu-result.json")
+    metrics = ["total", "pass", "fail", "skip"]
+    long = df[metrics].reset_index().melt(id_vars="date", var_name="metric")
+    # 112 series, as many as there are individual size charts.
+    many = pd.concat(
+        [long.assign(metric=long["metric"] + str(i)) for i in range(28)],
+        ignore_index=True,
+    )
+    cases = {
+        "15 runs, 4 series": lambda: apply_smoothing(long, "metric", "value"),
+        "15 runs, 112 series": lambda: apply_smoothing(many, "metric", "value"),
+        "90 days, 4 series": lambda: apply_smoothing(
+            long, "metric", "value", window="90D"
+        ),
+        "15 runs, ungrouped": lambda: apply_smoothing(long, None, "value"),
+    }
+    results = {}
+    for name, run in cases.items():
+        results[name] = best_time(runs, run)
+        report(name, results[name])
+    return results
+
+
+def render(runs):
+    import render_graphs
+
+    results = {}
+    for script, argv in render_graphs.JOBS:
+        module = render_graphs.load_script(script)
+        name = " ".join([script, *argv[1:]])
+        results[name] = best_time(
+            runs,
+            partial(quiet, module.main, argv),
+            # Without a manifest, every graph is drawn again.
+            lambda: Path("render-manifest.json").unlink(missing_ok=True),
+        )
+        report(name, results[name])
+    return results
+
+
+def quiet(function, *args):
+    """Call `function` with its standard output (the graph data) thrown away."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def compare(results, baseline, tolerance):
+    """Print every case next to its baseline; the number of slower ones."""
+    if results["settings"] != baseline.get("settings"):
+        print(f"note: the baseline was run with {baseline.get('settings')}")
+    slower = 0
+    for suite in SUITES:
+        for name, result in results.get(suite, {}).items():
+            old = baseline.get(suite, {}).get(name)
+            if old is None:
+                continue
+            key = "seconds" if "seconds" in result else "wall_s"
+            ratio = result[key] / old[key] if old[key] else float("inf")
+            mark = ""
+            if ratio > tolerance:
+                mark = "  SLOWER"
+                slower += 1
+            print(
+                f"{suite + ': ' + name:50} {old[key] * 1000:9.1f}ms -> "
+                f"{result[key] * 1000:9.1f}ms  {ratio:5.2f}x{mark}"
+            )
+    return slower
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "suites",
+        nargs="*",
+        metavar="SUITE",
+        help=f"what to benchmark: {', '.join(SUITES)} (default: all)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="runs per case, the best counts"
+    )
+    parser.add_argument(
+        "--commits",
+        type=int,
+        default=2000,
+        help="commits in the synthetic repository (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--authors",
+        type=int,
+        default=100,
+        help="authors of the synthetic repository (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--files",
+        type=int,
+        default=500,
+        help=".rs files in the synthetic repository (default: %(default)s)",
+    )
+    parser.add_argument("--json", metavar="FILE", help="also write the results here")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare with results saved by --json"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="slowdown factor --compare fails on (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    unknown = sorted(set(args.suites) - set(SUITES))
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+    if args.commits < 2:
+        parser.error("--commits must be at least 2")
+    suites = [suite for suite in SUITES if suite in args.suites or not args.suites]
+
+    settings = {"commits": args.commits, "authors": args.authors, "files": args.files}
+    results = {"python": sys.version.split()[0], "settings": settings}
+    with tempfile.TemporaryDirectory() as directory:
+        repo = os.path.join(directory, "repo")
+        if "count" in suites or "activity" in suites:
+            make_repo(repo, args.commits, args.authors, args.files)
+        scratch = os.path.join(directory, "scratch")
+        os.mkdir(scratch)
+        scratch_copy(scratch)
+        with open(os.path.join(scratch, "size-result.json")) as f:
+            dates = list(json.load(f))
+        make_individual_sizes(
+            os.path.join(scratch, "individual-size-result.json"), dates
+        )
+
+        cwd = os.getcwd()
+        for suite in suites:
+            print(f"== {suite}")
+            if suite == "startup":
+                results[suite] = startup(args.runs)
+            elif suite == "count":
+                results[suite] = count(repo, args.runs)
+            elif suite == "activity":
+                results[suite] = activity(repo, args.runs)
+            else:
+                # The graph code reads and writes its files in the current
+                # directory.
+                os.chdir(scratch)
+                try:
+                    if suite == "load":
+                        results[suite] = load(args.runs)
+                    elif suite == "smoothing":
+                        results[suite] = smoothing(args.runs)
+                    else:
+                        results[suite] = render(args.runs)
+                finally:
+                    os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"== compared with {args.compare}")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,177 +6,193 @@
 import collections
 import sys
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-
 from graph_common import (
     COLORS,
+    RenderManifest,
     add_gnu_release_markers,
     add_reference_lines,
+    add_step_markers,
     add_title,
     apply_smoothing,
     count_excluded,
+    downsample,
+    find_steps,
     load_excluded_tests,
+    load_test_results,
+    pyplot,
+    render_key,
+    save_figure,
+    seaborn,
     setup_theme,
     style_axes,
     style_legend,
 )
-
-if len(sys.argv) <= 2:
-    print("graph.py: <json file> <title>")
-    sys.exit()
-
-d = pd.read_json(sys.argv[1], orient="index")
-df = pd.DataFrame(d)
-title = sys.argv[2]
-
-df.columns.names = ["date"]
-df.index = pd.to_datetime(df.index, utc=True)
-
-print(df)
-
-# Set up modern theme
-setup_theme()
-
-# Create figure with better proportions and higher DPI
-fig, ax = plt.subplots(figsize=(18, 9), dpi=100)
-
-# Prepare data for plotting - melt to long format for Seaborn
-plot_columns = ["total", "pass", "fail"]
-if "error" in df.columns and df["error"].notna().any():
-    plot_columns.append("error")
-plot_columns.append("skip")
-
-df_plot = df[plot_columns].copy()
-df_plot = df_plot.reset_index()
-df_plot.rename(columns={df_plot.columns[0]: "date"}, inplace=True)
-df_plot_long = df_plot.melt(id_vars="date", var_name="metric", value_name="count")
-
-# Convert string values to numeric
-df_plot_long["count"] = pd.to_numeric(df_plot_long["count"], errors="coerce")
-
-# Apply smoothing using rolling average (window of 15 for smoother lines)
-df_plot_long["count_smooth"] = apply_smoothing(df_plot_long, "metric", "count")
-
-# Use color palette from common module
-palette = {k: COLORS[k] for k in ["total", "pass", "fail", "error", "skip"]}
-
-# Add gradient-like area fills first (behind lines)
-for metric in ["total", "pass", "fail"]:
-    if metric in df_plot.columns:
-        ax.fill_between(
-            df_plot["date"],
-            0,
-            df_plot[metric],
-            alpha=0.18,
-            color=palette[metric],
-            zorder=1,
-            linewidth=0,
+from instrumentation import session, span
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) <= 1:
+        print("graph.py: <json file> <title>")
+        return 0
+
+    df = load_test_results(argv[0])
+    title = argv[1]
+
+    print(df)
+
+    # Some GNU tests can never pass: they intercept glibc internals via
+    # LD_PRELOAD or break on GNU's own C sources with gdb. Drop them from the
+    # percentages, so they report how we do on the tests we can actually
+    # influence. See util/gnu-unfixable-tests.txt in the coreutils repo.
+    excluded = collections.Counter()
+    if title.lower() == "gnu":
+        excluded = count_excluded("aggregated-result.json", load_excluded_tests())
+
+    output = f"{title.lower()}-results.svg"
+    manifest = RenderManifest()
+    key = render_key(__file__, df, title, sorted(excluded.items()))
+    if manifest.is_current(output, key):
+        print(f"{output} is up to date")
+        return 0
+
+    plt = pyplot()
+    sns = seaborn()
+
+    # Set up modern theme
+    setup_theme()
+
+    # Create figure with better proportions and higher DPI
+    fig, ax = plt.subplots(figsize=(18, 9), dpi=100)
+
+    # Prepare data for plotting - melt to long format for Seaborn
+    plot_columns = ["total", "pass", "fail"]
+    if "error" in df.columns and df["error"].notna().any():
+        plot_columns.append("error")
+    plot_columns.append("skip")
+
+    df_plot = df[plot_columns].copy()
+    df_plot = df_plot.reset_index()
+    df_plot.rename(columns={df_plot.columns[0]: "date"}, inplace=True)
+    df_plot_long = df_plot.melt(id_vars="date", var_name="metric", value_name="count")
+
+    # Apply smoothing using rolling average (window of 15 for smoother lines)
+    df_plot_long["count_smooth"] = apply_smoothing(df_plot_long, "metric", "count")
+
+    # Only draw the points that can show at this size
+    df_lines = downsample(df_plot_long, "date", "count_smooth", "metric")
+    df_fills = downsample(df_plot, "date", ["total", "pass", "fail"])
+
+    # Use color palette from common module
+    palette = {k: COLORS[k] for k in ["total", "pass", "fail", "error", "skip"]}
+
+    # Add gradient-like area fills first (behind lines)
+    for metric in ["total", "pass", "fail"]:
+        if metric in df_plot.columns:
+            ax.fill_between(
+                df_fills["date"],
+                0,
+                df_fills[metric],
+                alpha=0.18,
+                color=palette[metric],
+                zorder=1,
+                linewidth=0,
+            )
+
+    # Use Seaborn's lineplot with enhanced styling and smoothed data
+    with span("lineplot"):
+        sns.lineplot(
+            data=df_lines,
+            x="date",
+            y="count_smooth",
+            hue="metric",
+            palette=palette,
+            linewidth=3.5,
+            ax=ax,
+            markers=False,  # Disable markers for smoother look
+            dashes=False,
+            alpha=1,
+            zorder=3,
         )
 
-# Use Seaborn's lineplot with enhanced styling and smoothed data
-sns.lineplot(
-    data=df_plot_long,
-    x="date",
-    y="count_smooth",
-    hue="metric",
-    palette=palette,
-    linewidth=3.5,
-    ax=ax,
-    markers=False,  # Disable markers for smoother look
-    dashes=False,
-    alpha=1,
-    zorder=3,
-)
-
-# Add title and subtitle
-add_title(
-    ax,
-    f"uutils coreutils — {title} Test Suite Results",
-    "Tracking test results over time to measure progress and compatibility",
-)
-
-# Style axes with labels and grid
-style_axes(ax, xlabel="Date", ylabel="Number of Tests")
-
-# Add reference lines
-y_max = df_plot_long["count_smooth"].max()
-add_reference_lines(ax, y_max)
-
-# Add vertical bars for GNU coreutils releases
-if title.lower() == "gnu":
-    add_gnu_release_markers(ax, df_plot["date"].min(), df_plot["date"].max(), y_max)
-
-# Style legend
-handles, labels = ax.get_legend_handles_labels()
-labels = [label.capitalize() for label in labels]
-style_legend(ax, handles, labels, ncol=len(plot_columns), loc="upper left")
-
-# Add percentage box on the top right
-latest_data = df.iloc[-1]
-total = pd.to_numeric(latest_data["total"], errors="coerce")
-pass_count = pd.to_numeric(latest_data["pass"], errors="coerce")
-fail_count = pd.to_numeric(latest_data["fail"], errors="coerce")
-skip_count = pd.to_numeric(latest_data["skip"], errors="coerce")
-
-# Some GNU tests can never pass: they intercept glibc internals via LD_PRELOAD
-# or break on GNU's own C sources with gdb. Drop them from the percentages, so
-# they report how we do on the tests we can actually influence. See
-# util/gnu-unfixable-tests.txt in the coreutils repo.
-excluded = collections.Counter()
-if title.lower() == "gnu":
-    excluded = count_excluded("aggregated-result.json", load_excluded_tests())
-
-total -= sum(excluded.values())
-fail_count -= excluded["FAIL"]
-skip_count -= excluded["SKIP"]
-
-pass_pct = (pass_count / total) * 100 if total > 0 else 0
-fail_pct = (fail_count / total) * 100 if total > 0 else 0
-skip_pct = (skip_count / total) * 100 if total > 0 else 0
-
-# Create text box
-textstr = "Latest Results:\n"
-textstr += f"Pass: {pass_pct:.1f}%\n"
-textstr += f"Fail: {fail_pct:.1f}%\n"
-textstr += f"Skip: {skip_pct:.1f}%"
-
-# Add text box on the top right
-props = {
-    "boxstyle": "round,pad=0.8",
-    "facecolor": "#FFFFFF",
-    "edgecolor": "#D1D5DB",
-    "linewidth": 2,
-    "alpha": 0.95,
-}
-ax.text(
-    0.98,
-    1.15,
-    textstr,
-    transform=ax.transAxes,
-    fontsize=14,
-    verticalalignment="top",
-    horizontalalignment="right",
-    bbox=props,
-    color="#374151",
-    fontweight="600",
-    zorder=10,
-)
-
-# Tight layout
-plt.tight_layout()
-
-# Save with high quality and optimized settings
-plt.savefig(
-    f"{title.lower()}-results.svg",
-    format="svg",
-    dpi=300,
-    bbox_inches="tight",
-    facecolor="white",
-    edgecolor="none",
-    metadata={
-        "Creator": "uutils coreutils tracking",
-        "Title": f"{title} Test Suite Results",
-    },
-)
+    # Mark the regressions, which the smoothed lines can hide
+    add_step_markers(ax, find_steps({title: df}), palette)
+
+    # Add title and subtitle
+    add_title(
+        ax,
+        f"uutils coreutils — {title} Test Suite Results",
+        "Tracking test results over time to measure progress and compatibility",
+    )
+
+    # Style axes with labels and grid
+    style_axes(ax, xlabel="Date", ylabel="Number of Tests")
+
+    # Add reference lines
+    y_max = df_plot_long["count_smooth"].max()
+    add_reference_lines(ax, y_max)
+
+    # Add vertical bars for GNU coreutils releases
+    if title.lower() == "gnu":
+        add_gnu_release_markers(ax, df_plot["date"].min(), df_plot["date"].max(), y_max)
+
+    # Style legend
+    handles, labels = ax.get_legend_handles_labels()
+    labels = [label.capitalize() for label in labels]
+    style_legend(ax, handles, labels, ncol=len(plot_columns), loc="upper left")
+
+    # Add percentage box on the top right
+    latest_data = df.iloc[-1]
+    total = latest_data["total"]
+    pass_count = latest_data["pass"]
+    fail_count = latest_data["fail"]
+    skip_count = latest_data["skip"]
+
+    total -= sum(excluded.values())
+    fail_count -= excluded["FAIL"]
+    skip_count -= excluded["SKIP"]
+
+    pass_pct = (pass_count / total) * 100 if total > 0 else 0
+    fail_pct = (fail_count / total) * 100 if total > 0 else 0
+    skip_pct = (skip_count / total) * 100 if total > 0 else 0
+
+    # Create text box
+    textstr = "Latest Results:\n"
+    textstr += f"Pass: {pass_pct:.1f}%\n"
+    textstr += f"Fail: {fail_pct:.1f}%\n"
+    textstr += f"Skip: {skip_pct:.1f}%"
+
+    # Add text box on the top right
+    props = {
+        "boxstyle": "round,pad=0.8",
+        "facecolor": "#FFFFFF",
+        "edgecolor": "#D1D5DB",
+        "linewidth": 2,
+        "alpha": 0.95,
+    }
+    ax.text(
+        0.98,
+        1.15,
+        textstr,
+        transform=ax.transAxes,
+        fontsize=14,
+        verticalalignment="top",
+        horizontalalignment="right",
+        bbox=props,
+        color="#374151",
+        fontweight="600",
+        zorder=10,
+    )
+
+    # Tight layout
+    plt.tight_layout()
+
+    # Save with high quality and optimized settings
+    save_figure(fig, output, f"{title} Test Suite Results")
+    manifest.record(output, key)
+    manifest.save()
+    return 0
+
+
+if __name__ == "__main__":
+    with session("graph"):
+        sys.exit(main(sys.argv[1:]))
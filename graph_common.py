@@ -6,11 +6,22 @@
 """Common styling and utilities for graph generation."""
 
 import collections
+import hashlib
+import io
 import json
+import math
 import os
+import re
+import string
+from importlib import metadata
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+
+from instrumentation import span
+
+# pandas, matplotlib and seaborn take most of a second to import, so they are
+# imported by the functions that need them. That way a graph script that has
+# nothing to redraw exits without loading the plotting libraries at all.
 
 # Modern vibrant color palette
 COLORS = {
@@ -26,11 +37,97 @@ COLORS = {
 
 # Single source of truth for the tests that can never pass, kept in the
 # coreutils repo and checked out by .github/workflows/gnu-data.yml.
-UNFIXABLE_TESTS_FILE = "uutils-coreutils/util/gnu-unfixable-tests.txt"
+UNFIXABLE_TESTS_FILE = "uutils-coreutils-history/util/gnu-unfixable-tests.txt"
+
+# Records what every SVG was last drawn from; see RenderManifest.
+RENDER_MANIFEST = "render-manifest.json"
+
+# Date formats of the result file keys, as (name, pattern, strptime format):
+# normalized test results, RFC 2822 (coreutils CI), git's default date format
+# (size and unsafe counts) and months (activity). See parse_dates.
+DATE_FORMATS = [
+    ("iso", r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ", "%Y-%m-%dT%H:%M:%SZ"),
+    (
+        "rfc2822",
+        r"[A-Z][a-z]{2}, \d{1,2} [A-Z][a-z]{2} \d{4} \d\d:\d\d:\d\d [+-]\d{4}",
+        "%a, %d %b %Y %H:%M:%S %z",
+    ),
+    (
+        "git",
+        r"[A-Z][a-z]{2} [A-Z][a-z]{2} \d{1,2} \d\d:\d\d:\d\d \d{4} [+-]\d{4}",
+        "%a %b %d %H:%M:%S %Y %z",
+    ),
+    ("month", r"\d{4}-\d\d", "%Y-%m"),
+]
+
+# Parsed result files are cached next to them as <name>.cache.npz; see
+# cached_frame. Bump to drop the caches written by older versions.
+FRAME_CACHE_VERSION = 1
+
+# Compact SVG output (see compact_svg), switched on with COMPACT_SVG=1.
+COMPACT_SVG = os.environ.get("COMPACT_SVG", "") not in ("", "0")
 
+# In compact mode, path vertices closer than this to the simplified outline
+# are dropped and coordinates are rounded to one decimal. Both are in SVG
+# points, well below a pixel at the graphs' size.
+COMPACT_TOLERANCE = 0.25
 
+# Time buckets per series for downsample(). The plot areas are about 1500px
+# wide and the lines 3-4px thick, so a bucket spans about two pixels, less
+# than a line is wide.
+DOWNSAMPLE_BUCKETS = 750
+
+# Step change detection (see detect_steps): the test counts it looks at, the
+# smallest change it reports, the number of previous runs that make up the
+# recent level, and how many times their usual spread a change must exceed.
+STEP_METRICS = ("pass", "fail", "error", "skip")
+STEP_THRESHOLD = 5
+STEP_WINDOW = 7
+STEP_NOISE = 4
+
+# Per-utility size jumps worth reporting (see find_size_jumps): a growth of
+# at least this many percent, or this many kilobytes.
+SIZE_JUMP_PERCENT = 5
+SIZE_JUMP_KILOBYTES = 64
+
+
+def pyplot():
+    """Import matplotlib.pyplot on the non-interactive Agg backend.
+
+    The graphs are only written to files, so this skips looking for a GUI
+    backend (and works without a display).
+
+    Returns:
+        The matplotlib.pyplot module
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def seaborn():
+    """Import seaborn once pyplot() has picked the backend.
+
+    seaborn imports matplotlib.pyplot itself, so importing it first would
+    load pyplot before the Agg backend is set.
+
+    Returns:
+        The seaborn module
+    """
+    pyplot()
+    import seaborn as sns
+
+    return sns
+
+
+@span("theme")
 def setup_theme():
     """Set up modern Seaborn theme with enhanced settings."""
+    plt = pyplot()
+    sns = seaborn()
     sns.set_theme(style="ticks", context="talk", palette="muted")
     plt.rcParams.update(
         {
@@ -48,29 +145,781 @@ def setup_theme():
             "axes.linewidth": 0.8,
             "xtick.color": "#555555",
             "ytick.color": "#555555",
+            # Fixed salt for the SVG element ids, so rendering the same data
+            # twice (or in another process) gives a byte-identical file.
+            "svg.hashsalt": "uutils-coreutils-tracking",
         }
     )
 
 
-def apply_smoothing(df, group_col, value_col, window=15):
+@span("savefig")
+def save_figure(fig, path, title):
+    """Save a figure as SVG with the settings shared by every graph, then close it.
+
+    With COMPACT_SVG, text is kept as text instead of glyph outlines and the
+    output goes through compact_svg().
+
+    Args:
+        fig: Matplotlib figure to save
+        path: Output file name
+        title: Title recorded in the SVG metadata
+    """
+    plt = pyplot()
+    rc = {"svg.fonttype": "none", "path.simplify_threshold": 1.0}
+    out = io.StringIO() if COMPACT_SVG else path
+    with plt.rc_context(rc if COMPACT_SVG else {}):
+        fig.savefig(
+            out,
+            format="svg",
+            dpi=300,
+            bbox_inches="tight",
+            facecolor="white",
+            edgecolor="none",
+            # No "Date": the file should only change when the graph does.
+            metadata={
+                "Creator": "uutils coreutils tracking",
+                "Title": title,
+                "Date": None,
+            },
+        )
+    plt.close(fig)
+    if COMPACT_SVG:
+        with span("compact svg"), open(path, "w") as f:
+            f.write(compact_svg(out.getvalue()))
+
+
+def _simplify_polyline(points, tolerance):
+    """Drop the vertices of a polyline that lie within `tolerance` of it.
+
+    Ramer-Douglas-Peucker: keep the point farthest from the chord between
+    the two ends if it is off by more than `tolerance`, then recurse on both
+    halves. Flat runs, such as the baseline of an area fill, collapse to
+    their two ends.
+    """
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        norm = math.hypot(dx, dy)
+        worst, worst_dist = None, tolerance
+        for i in range(first + 1, last):
+            x, y = points[i]
+            if norm:
+                dist = abs(dy * (x - x1) - dx * (y - y1)) / norm
+            else:
+                dist = math.hypot(x - x1, y - y1)
+            if dist > worst_dist:
+                worst, worst_dist = i, dist
+        if worst is not None:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [p for p, k in zip(points, keep, strict=True) if k]
+
+
+def _fmt(value):
+    text = f"{value:.1f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+_PATH_DATA = re.compile(r'(<path\b[^>]*?\bd=")([^"]*)(")')
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:e-?\d+)?")
+_XY_ATTR = re.compile(r'\b([xy])="(-?\d+(?:\.\d+)?)"')
+
+
+def _compact_path(d, tolerance):
+    tokens = d.split()
+    subpaths = []
+    i = 0
+    while i < len(tokens):
+        command = tokens[i]
+        if command == "M":
+            subpaths.append([[], False])
+        elif command == "z" and subpaths:
+            subpaths[-1][1] = True
+            i += 1
+            continue
+        elif command != "L" or not subpaths:
+            # Curves (legend frames, text boxes) are short; only round them.
+            return " ".join(
+                _fmt(float(t)) if _NUMBER.fullmatch(t) else t for t in tokens
+            )
+        subpaths[-1][0].append((float(tokens[i + 1]), float(tokens[i + 2])))
+        i += 3
+
+    out = []
+    for points, closed in subpaths:
+        if len(points) > 2:
+            points = _simplify_polyline(points, tolerance)
+        out.append(f"M{_fmt(points[0][0])} {_fmt(points[0][1])}")
+        out.extend(f"L{_fmt(x)} {_fmt(y)}" for x, y in points[1:])
+        if closed:
+            out.append("z")
+    return "".join(out)
+
+
+_ID_ATTR = re.compile(r'<(g|path)\b([^>]*?) id="([^"]*)"')
+_GROUP_TAG = re.compile(r"<g\b[^>]*>|</g>")
+_STYLE_ATTR = re.compile(r' style="([^"]*)"')
+# Matplotlib gives every label a rotation, by 0 degrees for the usual ones.
+_NO_ROTATION = re.compile(r' transform="rotate\(-?0 [^"]*\)"')
+_STYLE_SHEET = re.compile(r'(<style type="text/css">)(.*?)(</style>)', re.DOTALL)
+
+
+def _drop_unused_ids(svg):
+    """Drop the ids (figure_1, xtick_3, line2d_7...) that nothing refers to."""
+    used = set(re.findall(r'(?:url\(|href=")#([^)"]+)', svg))
+    return _ID_ATTR.sub(
+        lambda m: m.group(0) if m.group(3) in used else f"<{m.group(1)}{m.group(2)}",
+        svg,
+    )
+
+
+def _unwrap_groups(svg):
+    """Remove the `<g>` elements without attributes, keeping their content.
+
+    Matplotlib nests every tick, tick line and label in its own group, which
+    only carried the id.
+    """
+    out = []
+    bare = []  # for each open group, whether it is being removed
+    start = 0
+    for m in _GROUP_TAG.finditer(svg):
+        out.append(svg[start : m.start()])
+        start = m.end()
+        if m.group(0) == "</g>":
+            if not bare.pop():
+                out.append("</g>")
+        elif m.group(0).endswith("/>"):
+            if m.group(0) != "<g/>":
+                out.append(m.group(0))
+        else:
+            bare.append(m.group(0) == "<g>")
+            if not bare[-1]:
+                out.append(m.group(0))
+    out.append(svg[start:])
+    return "".join(out)
+
+
+def _style_classes(svg):
+    """Move the style attributes that repeat into classes in the style sheet.
+
+    Every tick, grid line and label otherwise repeats the same long style.
+    A class rule still wins over the sheet's `*` rule, as the attribute did.
+    """
+    counts = collections.Counter(_STYLE_ATTR.findall(svg))
+    classes = {}
+    for style, count in counts.most_common():
+        if count > 1 and len(style) > 8:
+            classes[style] = _class_name(len(classes))
+    if not classes:
+        return svg
+    svg = _STYLE_ATTR.sub(
+        lambda m: (
+            f' class="{classes[m.group(1)]}"' if m.group(1) in classes else m.group(0)
+        ),
+        svg,
+    )
+    rules = "".join(f"\n.{name}{{{style}}}" for style, name in classes.items())
+    return _STYLE_SHEET.sub(
+        lambda m: m.group(1) + m.group(2) + rules + m.group(3), svg, count=1
+    )
+
+
+def _class_name(index):
+    letters = string.ascii_lowercase
+    name = letters[index % 26]
+    while index >= 26:
+        index = index // 26 - 1
+        name = letters[index % 26] + name
+    return name
+
+
+def compact_svg(svg, tolerance=COMPACT_TOLERANCE):
+    """Shrink a matplotlib SVG without visibly changing it at normal zoom.
+
+    Straight-line paths are simplified to within `tolerance` points (the
+    long area fills and their flat baselines shrink the most), coordinates
+    are rounded to a tenth of a point and indentation is dropped. The
+    per-element scaffolding goes too: unused ids, the groups that only held
+    them, null rotations, and repeated style attributes, which become
+    classes. On graphs with few data points, such as the unsafe and activity
+    ones, that scaffolding is most of the file.
+    """
+    svg = _PATH_DATA.sub(
+        lambda m: m.group(1) + _compact_path(m.group(2), tolerance) + m.group(3), svg
+    )
+    svg = _XY_ATTR.sub(lambda m: f'{m.group(1)}="{_fmt(float(m.group(2)))}"', svg)
+    svg = _NO_ROTATION.sub("", svg)
+    svg = _style_classes(_unwrap_groups(_drop_unused_ids(svg)))
+    return re.sub(r"\n\s+", "\n", svg)
+
+
+def render_key(script, *inputs):
+    """Hash everything an output graph depends on.
+
+    That is the graph script and this module (which holds the shared style
+    settings), the plotting library versions, and the data slice and other
+    values the graph is drawn from.
+
+    Args:
+        script: Path of the graph script (its __file__)
+        *inputs: DataFrames, Series or other values with a stable repr()
+
+    Returns:
+        Hex digest identifying this exact rendering
+    """
+    digest = hashlib.sha256()
+    for path in (__file__, script):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    versions = [metadata.version(name) for name in ("matplotlib", "seaborn")]
+    digest.update(" ".join(versions).encode())
+    digest.update(f"compact={COMPACT_SVG}".encode())
+    for value in inputs:
+        if hasattr(value, "to_json"):
+            value = value.to_json(orient="split", date_format="iso")
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+class RenderManifest:
+    """Render keys of the SVGs on disk, to skip redrawing unchanged graphs.
+
+    Delete the manifest file to force every graph to be redrawn.
+    """
+
+    def __init__(self, path=RENDER_MANIFEST):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def is_current(self, output, key):
+        """Whether `output` exists and was drawn from the inputs behind `key`."""
+        return self.entries.get(output) == key and os.path.exists(output)
+
+    def record(self, output, key):
+        self.entries[output] = key
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+def parse_dates(values):
+    """Parse result file keys to UTC timestamps, a whole format at a time.
+
+    Each value must be in one of DATE_FORMATS. The format of the first value
+    is tried on the whole column, which is all it takes when the column does
+    not mix formats; otherwise the values are split by format and each group
+    is parsed with its own. Parsed keys are cached along with the rest of a
+    result file by cached_frame.
+
+    Args:
+        values: Date strings, e.g. a DataFrame index read from a result file
+
+    Returns:
+        DatetimeIndex in UTC
+
+    Raises:
+        ValueError: if a value is in none of the known formats
+    """
+    import pandas as pd
+
+    values = pd.Index(values, dtype=object)
+    if values.empty:
+        return pd.DatetimeIndex([], tz="UTC")
+    for _, pattern, fmt in DATE_FORMATS:
+        if re.fullmatch(pattern, str(values[0])):
+            try:
+                return pd.DatetimeIndex(pd.to_datetime(values, format=fmt, utc=True))
+            except ValueError:
+                break
+
+    text = pd.Series(values.astype(str))
+    unparsed = np.ones(len(values), dtype=bool)
+    parts = []
+    for _, pattern, fmt in DATE_FORMATS:
+        match = unparsed & text.str.fullmatch(pattern).to_numpy()
+        if match.any():
+            parts.append(pd.to_datetime(text[match], format=fmt, utc=True))
+            unparsed &= ~match
+    if unparsed.any():
+        examples = ", ".join(repr(v) for v in values[unparsed][:3])
+        raise ValueError(f"{unparsed.sum()} dates in an unknown format: {examples}")
+    dates = pd.concat(parts).sort_index()
+    return pd.DatetimeIndex(dates)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pack_column(values):
+    """Split a Series or Index into plain NumPy arrays and how to restore it.
+
+    Returns:
+        Arrays keyed by a name suffix, and a JSON-able spec for _unpack_column
+    """
+    import pandas as pd
+
+    values = pd.Index(values)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        naive = values.tz_convert(None).to_numpy()
+        return {"": naive}, {"tz": str(values.dtype.tz)}
+    if values.dtype.kind in "biufM":
+        return {"": values.to_numpy()}, {}
+    # Strings are stored once each, UTF-8 encoded, plus a code per row (-1
+    # where missing).
+    codes, uniques = pd.factorize(values)
+    if not all(isinstance(v, str) for v in uniques):
+        raise TypeError(f"cannot cache {values.dtype} values of {values.name!r}")
+    strings = np.array([v.encode() for v in uniques], dtype=bytes)
+    return {"": codes.astype(np.int32), "_strings": strings}, {"strings": True}
+
+
+def _unpack_column(npz, name, spec):
+    import pandas as pd
+
+    if "tz" in spec:
+        return pd.DatetimeIndex(npz[name]).tz_localize(spec["tz"])
+    if "strings" in spec:
+        strings = [v.decode() for v in npz[name + "_strings"]]
+        # Code -1 picks the trailing None.
+        return pd.Index(np.array([*strings, None], dtype=object)[npz[name]].tolist())
+    return pd.Index(npz[name])
+
+
+def _save_frame(cache, df, meta):
+    arrays = {}
+    columns = []
+    for i, (name, column) in enumerate([*df.items(), (df.index.name, df.index)]):
+        packed, spec = _pack_column(column)
+        arrays.update((f"c{i}{suffix}", array) for suffix, array in packed.items())
+        columns.append({"name": name, **spec})
+    # The last entry is the index.
+    arrays["meta"] = np.array(json.dumps({**meta, "columns": columns}))
+    # Write under another name first, so a reader never sees half a cache.
+    with open(cache + ".tmp", "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(cache + ".tmp", cache)
+
+
+def _load_frame(npz, meta):
+    import pandas as pd
+
+    *columns, index = (
+        (spec["name"], _unpack_column(npz, f"c{i}", spec))
+        for i, spec in enumerate(meta["columns"])
+    )
+    return pd.DataFrame(dict(columns), index=index[1].rename(index[0]))
+
+
+def cached_frame(path, parse):
+    """Return parse(path), cached in a columnar file next to `path`.
+
+    The cache (<path minus .json>.cache.npz) holds the DataFrame parse()
+    built, as one NumPy array per column. It is used while `path` keeps the
+    size and mtime it had when the cache was written; if those changed but
+    the content hash did not (a fresh checkout, say), it is still used. The
+    source of parse() is part of the key, so editing the parser rebuilds it.
+
+    Args:
+        path: JSON result file
+        parse: Function building a DataFrame from `path`. Columns must hold
+            numbers, dates or strings
+
+    Returns:
+        The DataFrame parse(path) returns
+    """
+    import pandas as pd
+
+    cache = os.path.splitext(path)[0] + ".cache.npz"
+    with open(parse.__code__.co_filename, "rb") as f:
+        parser = hashlib.sha256(f.read()).hexdigest()
+    stat = os.stat(path)
+    key = {
+        "version": FRAME_CACHE_VERSION,
+        "parser": f"{parse.__qualname__} {parser}",
+        "pandas": pd.__version__,
+    }
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if os.path.exists(cache):
+        with span("frame cache load"), np.load(cache) as npz:
+            meta = json.loads(npz["meta"].item())
+            if all(meta.get(k) == v for k, v in key.items()):
+                if all(meta["source"].get(k) == v for k, v in source.items()):
+                    return _load_frame(npz, meta)
+                sha256 = _file_sha256(path)
+                if meta["source"].get("sha256") == sha256:
+                    df = _load_frame(npz, meta)
+                    _save_frame(
+                        cache, df, {**key, "source": {**source, "sha256": sha256}}
+                    )
+                    return df
+
+    with span("parse"):
+        df = parse(path)
+    with span("frame cache save"):
+        sha256 = _file_sha256(path)
+        _save_frame(cache, df, {**key, "source": {**source, "sha256": sha256}})
+    return df
+
+
+def _parse_test_results(path):
+    import pandas as pd
+
+    with open(path) as f:
+        results = json.load(f)
+    df = pd.DataFrame.from_dict(results, orient="index")
+    try:
+        dates = pd.to_datetime(df.index, format="%Y-%m-%dT%H:%M:%SZ", utc=True)
+    except ValueError as e:
+        raise ValueError(
+            f"{path} is not normalized, run normalize_results.py on it: {e}"
+        ) from None
+    df.index = dates.rename("date")
+    return df
+
+
+def load_test_results(path):
+    """Load a normalized test-suite result file (see normalize_results.py).
+
+    Args:
+        path: gnu-result.json, busybox-result.json or toybox-result.json
+
+    Returns:
+        DataFrame indexed by UTC run date, one integer column per test count
+        (float where some runs lack it) plus the text fields such as sha
+    """
+    return cached_frame(path, _parse_test_results)
+
+
+def _parse_individual_sizes(path):
+    import pandas as pd
+
+    df = pd.read_json(path, orient="index", convert_axes=False)
+    dates = parse_dates(df.index)
+    sizes = pd.DataFrame(df["sizes"].tolist(), index=dates, dtype=float)
+    # No utility is called "sha", so it can share the cached frame.
+    sizes["sha"] = df["sha"].to_numpy() if "sha" in df.columns else None
+    # The file is not always in date order, and the size jumps and smoothing
+    # compare each run with the one before it.
+    return sizes.sort_index(kind="stable")
+
+
+def load_individual_sizes(path):
+    """Load individual-size-result.json.
+
+    Args:
+        path: File mapping a date to the "sha" and per-utility "sizes" of a run
+
+    Returns:
+        Tuple of a DataFrame indexed by date with one column of sizes (in
+        kilobytes) per utility, NaN where it was missing, and the Series of
+        the sha of each run
+    """
+    sizes = cached_frame(path, _parse_individual_sizes)
+    return sizes.drop(columns="sha"), sizes["sha"]
+
+
+def find_size_jumps(
+    sizes, percent=SIZE_JUMP_PERCENT, kilobytes=SIZE_JUMP_KILOBYTES, shrinks=False
+):
+    """Find where a size grew by at least `percent` percent or `kilobytes`.
+
+    Each value is compared with the previous value of the same row, skipping
+    NaNs, so a utility missing from some runs is compared across the gap.
+    All rows are handled in the same array operations.
+
+    Args:
+        sizes: 2D array, utilities by runs, NaN where a size is missing
+        percent: Smallest growth to report, in percent of the previous size
+        kilobytes: Smallest growth to report, in kilobytes
+        shrinks: Also report size drops of the same amounts
+
+    Returns:
+        Tuple of 1D arrays with one item per jump: row, column, column of
+        the previous value, previous value, and new value
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    rows, n = sizes.shape
+    # Column of the latest non-NaN value up to each position, -1 if none.
+    valid = ~np.isnan(sizes)
+    latest = np.maximum.accumulate(np.where(valid, np.arange(n), -1), axis=1)
+    previous = np.concatenate([np.full((rows, 1), -1), latest[:, :-1]], axis=1)
+    row, col = np.nonzero(valid & (previous >= 0))
+    before_col = previous[row, col]
+    before = sizes[row, before_col]
+    after = sizes[row, col]
+    change = after - before
+    if shrinks:
+        change = np.abs(change)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grown = (change >= kilobytes) | (change * 100 >= before * percent)
+    grown &= change > 0
+    return row[grown], col[grown], before_col[grown], before[grown], after[grown]
+
+
+def _window_indexer(start, end):
+    """pandas window indexer with precomputed [start, end) bounds per row."""
+    from pandas.api.indexers import BaseIndexer
+
+    class Windows(BaseIndexer):
+        def get_window_bounds(
+            self, num_values=0, min_periods=None, center=None, closed=None, step=None
+        ):
+            return start, end
+
+    return Windows()
+
+
+def _centered_group_windows(codes, window):
+    """Bounds of centered windows of `window` rows that stay within a group.
+
+    `codes` are the sorted group codes of the rows. The bounds are the ones
+    rolling(window, center=True) would give each group on its own.
+    """
+    n = len(codes)
+    # -1 marks rows without a group, so pad with -2.
+    edges = np.flatnonzero(np.diff(codes, prepend=-2, append=-2))
+    sizes = np.diff(edges)
+    first = np.repeat(edges[:-1], sizes)
+    last = np.repeat(edges[1:], sizes)
+    end = np.arange(1, n + 1) + (window - 1) // 2
+    start = np.clip(end - window, first, last)
+    return start, np.clip(end, first, last)
+
+
+@span("smoothing")
+def apply_smoothing(df, group_col, value_col, window=15, time_col="date"):
     """Apply rolling average smoothing to data.
 
+    Groups are smoothed together in one rolling pass over the rows sorted by
+    group, with window bounds that stop at the group edges, instead of a
+    separate rolling() per group. The values are the same as smoothing each
+    group on its own.
+
     Args:
         df: DataFrame with data to smooth
         group_col: Column name to group by (or None for no grouping)
         value_col: Column name containing values to smooth
-        window: Rolling window size (default: 15)
+        window: Rolling window size, either a number of rows (default: 15)
+            or a time span such as "90D" measured on time_col
+        time_col: Column with the dates, used when window is a time span
 
     Returns:
         Series with smoothed values
     """
-    if group_col:
-        return df.groupby(group_col)[value_col].transform(
-            lambda x: x.rolling(window=window, min_periods=1, center=True).mean()
+    import pandas as pd
+
+    if isinstance(window, str):
+        frame = pd.DataFrame(
+            {"value": df[value_col].to_numpy(), "time": pd.DatetimeIndex(df[time_col])}
         )
-    else:
+        if group_col:
+            frame["group"] = df[group_col].to_numpy()
+            frame = frame.groupby("group", sort=False)
+        smoothed = frame.rolling(window, min_periods=1, center=True, on="time").mean()
+        if group_col:
+            smoothed = smoothed.droplevel(0).reindex(range(len(df)))
+        return pd.Series(smoothed["value"].to_numpy(), index=df.index, name=value_col)
+    if not group_col:
         return df[value_col].rolling(window=window, min_periods=1, center=True).mean()
 
+    codes, _ = pd.factorize(df[group_col])
+    order = np.argsort(codes, kind="stable")
+    start, end = _centered_group_windows(codes[order], window)
+    values = pd.Series(df[value_col].to_numpy()[order])
+    smoothed = values.rolling(_window_indexer(start, end), min_periods=1).mean()
+    result = np.empty(len(order))
+    result[order] = smoothed.to_numpy()
+    # Like groupby(), leave rows without a group out.
+    result[codes < 0] = np.nan
+    return pd.Series(result, index=df.index, name=value_col)
+
+
+def _bucket_extremes(x, y, buckets):
+    """Positions of the first, last, lowest and highest point of each bucket.
+
+    `x` must be sorted. The x range is cut into `buckets` equal intervals;
+    NaN values of `y` are always kept so that gaps stay where they are.
+    """
+    n = len(x)
+    if n <= buckets or x[-1] <= x[0]:
+        return np.arange(n)
+    span = x[-1] - x[0]
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    ends = np.append(starts[1:], n) - 1
+    # Sorted by (bucket, y), each bucket runs from its lowest to its highest
+    # value; NaNs sort last, so look at the non-NaN values only.
+    missing = np.isnan(y)
+    valid = np.flatnonzero(~missing)
+    order = valid[np.lexsort((y[valid], bucket[valid]))]
+    sorted_bucket = bucket[order]
+    lows = order[np.flatnonzero(np.diff(sorted_bucket, prepend=-1))]
+    highs = order[np.flatnonzero(np.diff(sorted_bucket, append=buckets))]
+    return np.unique(
+        np.concatenate([starts, ends, lows, highs, np.flatnonzero(missing)])
+    )
+
+
+@span("downsample")
+def downsample(df, x_col, y_cols, group_col=None, buckets=DOWNSAMPLE_BUCKETS):
+    """Drop the rows of a time series that cannot show up in the graph.
+
+    Min/max bucketing: the x range is cut into `buckets` intervals and in
+    each one only the first, last, lowest and highest point of every `y_cols`
+    column is kept. Peaks and drops survive, while runs of points that fall
+    within the same couple of pixels collapse. Run it after apply_smoothing,
+    on the columns that are drawn.
+
+    Args:
+        df: DataFrame with the series to plot
+        x_col: Column with the x values (dates or numbers)
+        y_cols: Column name, or list of column names, plotted against x_col
+        group_col: Column name to group by (or None for no grouping)
+        buckets: Number of x intervals per series
+
+    Returns:
+        DataFrame with the kept rows of df, in their original order
+    """
+    import pandas as pd
+
+    if isinstance(y_cols, str):
+        y_cols = [y_cols]
+    groups = df.groupby(group_col, sort=False).indices if group_col else None
+    if groups is None:
+        groups = {None: np.arange(len(df))}
+
+    x_all = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x_all):
+        x_all = x_all.astype("int64")
+    x_all = x_all.to_numpy(dtype=float)
+
+    keep = []
+    for positions in groups.values():
+        positions = positions[np.argsort(x_all[positions], kind="stable")]
+        x = x_all[positions]
+        for col in y_cols:
+            y = pd.to_numeric(df[col].iloc[positions], errors="coerce")
+            y = y.to_numpy(dtype=float)
+            keep.append(positions[_bucket_extremes(x, y, buckets)])
+    if not keep:
+        return df
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+@span("step detection")
+def detect_steps(
+    series, threshold=STEP_THRESHOLD, window=STEP_WINDOW, noise=STEP_NOISE
+):
+    """Find the runs where a count moves away from its recent level.
+
+    The level of a run is the median of the `window` runs before it, and the
+    noise is their median absolute deviation from it. A run whose change from
+    the level reaches both `threshold` and `noise` times the noise is
+    flagged; of several flagged runs in a row moving the same way, only the
+    first is reported. Every series is handled in the same array operations.
+
+    Args:
+        series: 2D array with one series per row, NaN where a series has no
+            value (a count that was not recorded, or padding at the end)
+        threshold: Smallest change to report
+        window: Number of previous runs the level is taken from
+        noise: Factor of the noise a change must exceed
+
+    Returns:
+        Tuple of 1D arrays with one item per step: row, column, level before
+        the step, change, and whether it is a blip, that is, the next run is
+        back within `threshold` of the level
+    """
+    import warnings
+
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    series = np.asarray(series, dtype=float)
+    rows = series.shape[0]
+    padded = np.concatenate([np.full((rows, window), np.nan), series], axis=1)
+    previous = sliding_window_view(padded[:, :-1], window, axis=1)
+    with warnings.catch_warnings():
+        # All-NaN windows (the first run, padding) just give a NaN level.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        level = np.nanmedian(previous, axis=2)
+        spread = np.nanmedian(np.abs(previous - level[..., None]), axis=2)
+    change = series - level
+    with np.errstate(invalid="ignore"):
+        flagged = np.abs(change) >= np.maximum(threshold, noise * spread)
+    direction = np.sign(np.where(flagged, change, 0))
+    before = np.concatenate([np.zeros((rows, 1)), direction[:, :-1]], axis=1)
+    row, col = np.nonzero(flagged & (direction != before))
+
+    following = np.concatenate([series[:, 1:], np.full((rows, 1), np.nan)], axis=1)
+    with np.errstate(invalid="ignore"):
+        blip = np.abs(following - level) < threshold
+    return row, col, level[row, col], change[row, col], blip[row, col]
+
+
+def find_steps(results, metrics=STEP_METRICS, **kwargs):
+    """Run detect_steps over the counts of several test-suite result files.
+
+    Args:
+        results: Dict of name to DataFrame from load_test_results()
+        metrics: Count columns to look at
+        **kwargs: threshold, window and noise for detect_steps()
+
+    Returns:
+        List of steps, oldest first, as dicts with the name, date, sha,
+        metric, the level before, the value after, the change, whether it
+        is a "blip" or a "step", and whether it is a regression (fewer
+        passing tests, or more failing or erroring ones)
+    """
+    keys = [(name, metric) for name in results for metric in metrics]
+    length = max((len(df) for df in results.values()), default=0)
+    series = np.full((len(keys), length), np.nan)
+    for i, (name, metric) in enumerate(keys):
+        df = results[name]
+        if metric in df.columns:
+            series[i, : len(df)] = df[metric].to_numpy(dtype=float)
+
+    steps = []
+    for row, col, level, change, blip in zip(
+        *detect_steps(series, **kwargs), strict=True
+    ):
+        name, metric = keys[row]
+        df = results[name]
+        sha = df["sha"].iloc[col] if "sha" in df.columns else None
+        steps.append(
+            {
+                "name": name,
+                "date": df.index[col].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "sha": sha if isinstance(sha, str) else None,
+                "metric": metric,
+                "before": float(level),
+                "after": float(series[row, col]),
+                "change": float(change),
+                "kind": "blip" if blip else "step",
+                "regression": bool(
+                    (metric == "pass" and change < 0)
+                    or (metric in ("fail", "error") and change > 0)
+                ),
+            }
+        )
+    steps.sort(key=lambda step: (step["date"], step["name"], step["metric"]))
+    return steps
+
 
 def style_axes(ax, xlabel="Date", ylabel="Value"):
     """Apply modern styling to axes.
@@ -80,6 +929,8 @@ def style_axes(ax, xlabel="Date", ylabel="Value"):
         xlabel: Label for x-axis
         ylabel: Label for y-axis
     """
+    plt = pyplot()
+    sns = seaborn()
     ax.set_xlabel(xlabel, fontsize=15, fontweight="600", labelpad=15, color="#374151")
     ax.set_ylabel(ylabel, fontsize=15, fontweight="600", labelpad=15, color="#374151")
 
@@ -254,11 +1105,34 @@ def add_gnu_release_markers(ax, x_min, x_max, y_max, releases=GNU_COREUTILS_RELE
             )
 
 
+def add_step_markers(ax, steps, palette):
+    """Mark regressions from find_steps() at the unsmoothed value of the run.
+
+    Smoothing flattens a drop that lasts a run or two, so these show where
+    the lines hide one. Pass drops point down, fail and error rises up.
+    """
+    import pandas as pd
+
+    for step in steps:
+        if not step["regression"] or step["metric"] not in palette:
+            continue
+        ax.scatter(
+            pd.to_datetime(step["date"], utc=True),
+            step["after"],
+            marker="v" if step["change"] < 0 else "^",
+            s=70,
+            color=palette[step["metric"]],
+            edgecolors="#FFFFFF",
+            linewidths=1,
+            zorder=5,
+        )
+
+
 def load_excluded_tests(path=UNFIXABLE_TESTS_FILE):
     """Read the list of tests that cannot pass for structural reasons.
 
     The list is maintained in the coreutils repo, which the workflow checks out
-    into uutils-coreutils/.
+    into uutils-coreutils-history/.
 
     Args:
         path: File with one "<util>/<test>.log" entry per line, '#' comments
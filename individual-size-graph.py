@@ -3,57 +3,87 @@
 # For the full copyright and license information, please view the LICENSE
 # file that was distributed with this source code.
 
-import sys
-from pathlib import Path
-
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-
-from graph_common import COLORS, add_title, apply_smoothing, setup_theme, style_axes
-
-df = pd.read_json(sys.argv[1], orient="index")
-df.index = pd.to_datetime(df.index, utc=True)
-
-Path("individual-size-results").mkdir(exist_ok=True)
-
-# Set up modern theme
-setup_theme()
+"""Render one size chart per utility from individual-size-result.json.
 
-# Use color from common module
-size_color = COLORS["default"]
-
-for name, series in df["sizes"].apply(pd.Series).items():
-    # Filter out None values which indicate missing data for 'name'
-    sizes = series.dropna()
-
-    if not sizes.empty:
-        print(name)
-        print(sizes)
-
-        # Create figure with better proportions and higher DPI
-        fig, ax = plt.subplots(figsize=(18, 9), dpi=100)
-
-        # Prepare data for Seaborn
-        plot_data = pd.DataFrame(
-            {"date": sizes.index, "size": pd.to_numeric(sizes.values, errors="coerce")}
-        )
+The charts are independent, so they are rendered on a pool of `--jobs`
+processes. Each worker gets the size table once, when it starts, and then
+only receives utility names. Charts whose series did not change since they
+were last drawn are skipped (see graph_common.RenderManifest).
+"""
 
-        # Apply smoothing using rolling average
-        plot_data["size_smooth"] = apply_smoothing(plot_data, None, "size")
-
-        # Add gradient-like area fill first
-        ax.fill_between(
-            plot_data["date"],
-            0,
-            plot_data["size"],
-            alpha=0.2,
-            color=size_color,
-            zorder=1,
-            linewidth=0,
-        )
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-        # Use Seaborn's lineplot with enhanced styling and smoothed data
+from graph_common import (
+    COLORS,
+    RenderManifest,
+    add_title,
+    apply_smoothing,
+    downsample,
+    load_individual_sizes,
+    pyplot,
+    render_key,
+    save_figure,
+    seaborn,
+    setup_theme,
+    style_axes,
+)
+from instrumentation import session, span
+
+OUTPUT_DIR = "individual-size-results"
+
+# Per-utility sizes (one column per utility), set once per worker process.
+_sizes = None
+
+
+def output_path(name):
+    return f"{OUTPUT_DIR}/{name}.svg"
+
+
+def render(name, sizes):
+    """Render the chart of one utility from its non-missing sizes."""
+    import pandas as pd
+
+    plt = pyplot()
+    sns = seaborn()
+
+    # Use color from common module
+    size_color = COLORS["default"]
+
+    # Create figure with better proportions and higher DPI
+    fig, ax = plt.subplots(figsize=(18, 9), dpi=100)
+
+    # Prepare data for Seaborn
+    plot_data = pd.DataFrame(
+        {
+            "date": sizes.index,
+            "size": pd.to_numeric(sizes.values, errors="coerce"),
+        }
+    )
+
+    # Apply smoothing using rolling average
+    plot_data["size_smooth"] = apply_smoothing(plot_data, None, "size")
+
+    # Only draw the points that can show at this size
+    plot_data = downsample(plot_data, "date", ["size", "size_smooth"])
+
+    # Add gradient-like area fill first
+    ax.fill_between(
+        plot_data["date"],
+        0,
+        plot_data["size"],
+        alpha=0.2,
+        color=size_color,
+        zorder=1,
+        linewidth=0,
+    )
+
+    # Use Seaborn's lineplot with enhanced styling and smoothed data
+    with span("lineplot"):
         sns.lineplot(
             data=plot_data,
             x="date",
@@ -61,37 +91,102 @@ for name, series in df["sizes"].apply(pd.Series).items():
             color=size_color,
             linewidth=4,
             ax=ax,
-            marker=False,  # Disable markers for smoother look
+            markers=False,  # Disable markers for smoother look
             alpha=1,
             zorder=3,
         )
 
-        # Add title and subtitle
-        add_title(
-            ax,
-            f'uutils coreutils — "{name}" Binary Size',
-            "Individual utility size tracking over development history",
-        )
-
-        # Style axes with labels and grid
-        style_axes(ax, xlabel="Date", ylabel="Size (kilobytes)")
-
-        # Tight layout
-        plt.tight_layout()
-
-        # Save with high quality
-        plt.savefig(
-            f"individual-size-results/{name}.svg",
-            format="svg",
-            dpi=300,
-            bbox_inches="tight",
-            facecolor="white",
-            edgecolor="none",
-            metadata={
-                "Creator": "uutils coreutils tracking",
-                "Title": f"{name} Binary Size",
-            },
-        )
-        plt.close(fig)
+    # Add title and subtitle
+    add_title(
+        ax,
+        f'uutils coreutils — "{name}" Binary Size',
+        "Individual utility size tracking over development history",
+    )
+
+    # Style axes with labels and grid
+    style_axes(ax, xlabel="Date", ylabel="Size (kilobytes)")
+
+    # Tight layout
+    plt.tight_layout()
+
+    # Save with high quality
+    save_figure(fig, output_path(name), f"{name} Binary Size")
+
+
+def _init_worker(sizes):
+    global _sizes
+    _sizes = sizes
+    setup_theme()
+
+
+def _render_worker(name):
+    render(name, _sizes[name].dropna())
+
+
+def render_parallel(names, sizes, jobs):
+    """Render the charts of `names` on a pool of `jobs` processes."""
+    # Forked workers inherit the table instead of unpickling a copy each.
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(sizes,),
+    ) as pool:
+        # list() so that a failing chart raises here.
+        list(pool.map(_render_worker, names))
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="individual-size-graph.py", description=__doc__
+    )
+    parser.add_argument("json", help="individual-size-result.json")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of charts to render in parallel (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+
+    sizes, _ = load_individual_sizes(args.json)
+
+    Path(OUTPUT_DIR).mkdir(exist_ok=True)
+
+    manifest = RenderManifest()
+    names = []
+    keys = {}
+    for name, series in sizes.items():
+        # Filter out None values which indicate missing data for 'name'
+        series = series.dropna()
+        if series.empty:
+            print(f"Warning: No data found for '{name}'")
+            continue
+        keys[name] = render_key(__file__, name, series)
+        if manifest.is_current(output_path(name), keys[name]):
+            continue
+        print(name)
+        print(series)
+        names.append(name)
+    print(f"{len(names)} of {len(keys)} size charts to render")
+
+    if names:
+        # Set up modern theme (before forking, so the workers inherit the
+        # plotting libraries instead of each importing them)
+        setup_theme()
+
+    if args.jobs <= 1:
+        for name in names:
+            render(name, sizes[name].dropna())
     else:
-        print(f"Warning: No data found for '{name}'")
+        render_parallel(names, sizes, args.jobs)
+
+    for name in names:
+        manifest.record(output_path(name), keys[name])
+    manifest.save()
+    return 0
+
+
+if __name__ == "__main__":
+    with session("individual-size-graph"):
+        sys.exit(main(sys.argv[1:]))
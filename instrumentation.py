@@ -0,0 +1,153 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Timed spans around the stages of the tracking scripts.
+
+Code marks a stage with
+
+    with span("git ls-tree"):
+        ...
+
+and the time spent in each named stage, and how often it ran, adds up over
+the process. A script's main() runs inside session(), which prints the
+per-stage summary to stderr when it is done (stdout often carries JSON) and,
+with --timings FILE or TRACKING_TIMINGS=FILE, also writes it as JSON.
+
+With --profile [DIR] or TRACKING_PROFILE=DIR (1 for the current directory),
+the session also runs under cProfile and tracemalloc, and leaves
+<name>.prof (for `python -m pstats` or snakeviz) and <name>.memory.txt (the
+peak memory use, and the lines holding the most memory at the end) in DIR.
+
+Spans can nest, so the totals of the stages may overlap. Only the process
+that runs the session is covered: spans in pool workers are not collected.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_ENV = "TRACKING_PROFILE"
+TIMINGS_ENV = "TRACKING_TIMINGS"
+
+# Allocation sites listed in <name>.memory.txt.
+MEMORY_TOP = 30
+
+_lock = threading.Lock()
+# Stage name to [calls, seconds], in the order the stages first ran.
+_spans: dict[str, list] = {}
+
+
+def record(name: str, seconds: float) -> None:
+    with _lock:
+        entry = _spans.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+@contextlib.contextmanager
+def span(name: str):
+    """Add the time spent in the `with` block to the stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timings() -> dict[str, dict[str, float]]:
+    """`{stage: {"calls": n, "seconds": s}}` so far."""
+    with _lock:
+        return {
+            name: {"calls": calls, "seconds": round(seconds, 6)}
+            for name, (calls, seconds) in _spans.items()
+        }
+
+
+def format_summary(name: str, wall: float) -> str:
+    """The timings so far as a table, the slowest stage first."""
+    stages = sorted(timings().items(), key=lambda item: -item[1]["seconds"])
+    lines = [f"{name}: {wall:.3f}s", f"  {'stage':40} {'calls':>7} {'total':>9}"]
+    for stage, entry in stages:
+        lines.append(
+            f"  {stage:40} {entry['calls']:7} {entry['seconds'] * 1000:7.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def add_arguments(parser) -> None:
+    """Add --profile and --timings to an argparse parser."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=".",
+        metavar="DIR",
+        help=f"write cProfile and tracemalloc dumps to DIR (or ${PROFILE_ENV})",
+    )
+    parser.add_argument(
+        "--timings",
+        metavar="FILE",
+        help=f"write the per-stage timings here as JSON (or ${TIMINGS_ENV})",
+    )
+
+
+def _dump_memory(path: str) -> None:
+    import tracemalloc
+
+    _, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("lineno")
+    with open(path, "w") as f:
+        held = sum(stat.size for stat in stats)
+        f.write(f"peak {peak / 1024:.1f} KiB, {held / 1024:.1f} KiB still held by:\n")
+        f.writelines(f"{stat}\n" for stat in stats[:MEMORY_TOP])
+
+
+@contextlib.contextmanager
+def session(name: str, profile: str | None = None, timings_path: str | None = None):
+    """Time a whole run and report on it at the end.
+
+    Args:
+        name: Name of the run (the script), for the summary and dump files
+        profile: Directory for the cProfile/tracemalloc dumps, None for none;
+            defaults to $TRACKING_PROFILE
+        timings_path: JSON file for the timings; defaults to $TRACKING_TIMINGS
+    """
+    if profile is None and os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+        profile = os.environ[PROFILE_ENV]
+        profile = "." if profile == "1" else profile
+    timings_path = timings_path or os.environ.get(TIMINGS_ENV) or None
+
+    profiler = None
+    if profile is not None:
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile, exist_ok=True)
+            base = os.path.join(profile, name)
+            profiler.dump_stats(f"{base}.prof")
+            _dump_memory(f"{base}.memory.txt")
+            tracemalloc.stop()
+            print(f"profile: {base}.prof, {base}.memory.txt", file=sys.stderr)
+        print(format_summary(name, wall), file=sys.stderr)
+        if timings_path:
+            with open(timings_path, "w") as f:
+                json.dump(
+                    {"name": name, "wall_s": round(wall, 6), "stages": timings()},
+                    f,
+                    indent=2,
+                )
+                f.write("\n")
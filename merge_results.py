@@ -0,0 +1,173 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Merge new entries into a date-keyed result file.
+
+Result files map a date to the data of one run. Incoming entries are merged
+like `jq -s '.[0] * .[1]'` did (an existing entry is updated field by field),
+and the file stays sorted by date.
+
+The common case is that every incoming entry is newer than the last one in
+the file. Then the new entries are appended in place, without parsing the
+file as JSON: only its tail is read, whatever the length of the history. The
+keys found there give the last date, and must be in date order; a file that
+never went through this tool, such as a CI artifact, may not be. Anything
+else (an update, an older entry, keys out of order or a file not written by
+this tool) falls back to rewriting the whole file in order, which also sorts
+it, so from then on its tail is a fair sample.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+
+from normalize_results import normalize, parse_date
+
+# How much of the end of a file to read to find its last entry, at first.
+TAIL_SIZE = 64 * 1024
+
+# A top-level key, as json.dump(indent=2) writes it.
+TOP_LEVEL_KEY = re.compile(rb'\n  ("(?:[^"\\]|\\.)*"): \{\n')
+
+
+def sort_key(key):
+    return parse_date(key), key
+
+
+def validate(incoming):
+    """Check that `incoming` maps dates to non-empty objects.
+
+    Raises:
+        TypeError, ValueError: with the first problem found
+    """
+    if not isinstance(incoming, dict):
+        raise TypeError("expected an object mapping dates to entries")
+    for key, entry in incoming.items():
+        if parse_date(key).tzinfo is None:
+            raise ValueError(f"date without a timezone: {key!r}")
+        if not isinstance(entry, dict) or not entry:
+            raise ValueError(f"{key}: expected a non-empty object, got {entry!r}")
+
+
+def deep_merge(old, new):
+    """Merge `new` into `old` the way jq's `*` does."""
+    merged = dict(old)
+    for key, value in new.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = deep_merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def encode_entries(results):
+    """The lines json.dump(results, indent=2) writes between its braces."""
+    return json.dumps(results, indent=2)[2:-2]
+
+
+def tail_keys(path):
+    """The last top-level keys of a file written by write_results, or None.
+
+    Only reads as much of the end of the file as it takes to find two keys
+    (or all of them, if there are fewer). None means the file does not end
+    the way write_results leaves it.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        tail_size = TAIL_SIZE
+        while True:
+            start = max(size - tail_size, 0)
+            f.seek(start)
+            tail = f.read()
+            if not tail.endswith(b"\n  }\n}\n"):
+                return None
+            keys = [json.loads(m.group(1)) for m in TOP_LEVEL_KEY.finditer(tail)]
+            if len(keys) >= 2 or start == 0:
+                return keys or None
+            tail_size *= 4
+
+
+def in_order(keys):
+    """Whether `keys` are strictly increasing by date."""
+    dates = [sort_key(key) for key in keys]
+    return all(a < b for a, b in itertools.pairwise(dates))
+
+
+def append_results(path, incoming):
+    """Append `incoming` (sorted, all newer) to a file written by write_results."""
+    with open(path, "rb+") as f:
+        f.seek(-len(b"\n}\n"), os.SEEK_END)
+        f.truncate()
+        f.write(f",\n{encode_entries(incoming)}\n}}\n".encode())
+
+
+def write_results(path, results):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(f"{{\n{encode_entries(results)}\n}}\n" if results else "{}\n")
+    os.replace(tmp, path)
+
+
+def merge(path, incoming):
+    """Merge `incoming` into the result file at `path`.
+
+    Returns:
+        "appended" or "rewrote", for the log
+    """
+    incoming = dict(sorted(incoming.items(), key=lambda item: sort_key(item[0])))
+    if os.path.exists(path) and incoming:
+        keys = tail_keys(path)
+        if keys is not None and in_order([*keys, next(iter(incoming))]):
+            append_results(path, incoming)
+            return "appended"
+
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            results = json.load(f)
+    for key, entry in incoming.items():
+        results[key] = deep_merge(results.get(key, {}), entry)
+    write_results(path, dict(sorted(results.items(), key=lambda r: sort_key(r[0]))))
+    return "rewrote"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("result", help="result file to merge into")
+    parser.add_argument(
+        "incoming",
+        nargs="?",
+        help="file with the new entries (without it, only sort the result file)",
+    )
+    parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help="convert incoming test-suite entries first (see normalize_results.py)",
+    )
+    args = parser.parse_args()
+
+    incoming = {}
+    if args.incoming:
+        with open(args.incoming) as f:
+            incoming = json.load(f)
+    try:
+        validate(incoming)
+        if args.normalize:
+            incoming = normalize(incoming)
+        action = merge(args.result, incoming)
+    except (TypeError, ValueError) as e:
+        print(f"{args.result}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{args.result}: {action}, {len(incoming)} incoming entries")
+    for key, entry in incoming.items():
+        print(f"  {key}: {json.dumps(entry)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Rewrite test-suite result files in their normalized form.
+
+gnu-result.json, busybox-result.json and toybox-result.json map a date to
+the test counts of one run. The coreutils CI writes new entries as
+
+    "Tue, 20 Apr 2021 16:06:13 +0200": {"total": "624", "pass": " 139", ...}
+
+and this rewrites every entry as
+
+    "2021-04-20T14:06:13Z": {"total": 624, "pass": 139, ...}
+
+that is, keyed by ISO 8601 UTC timestamps, sorted by time, with the counts
+as integers. Other fields (sha, comment) are kept as they are. Files may mix
+both forms, so this can run after every merge; when two keys name the same
+instant, the later one in the file wins, like it does in a jq merge.
+"""
+
+import argparse
+import json
+import sys
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+# Fields of an entry that hold test counts.
+TEST_COUNTS = ("total", "pass", "fail", "skip", "xpass", "error")
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def parse_date(key):
+    """Parse a result key, either RFC 2822 or ISO 8601, to an aware datetime."""
+    try:
+        return datetime.fromisoformat(key)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(key)
+    except (TypeError, ValueError):
+        raise ValueError(f"unrecognized date {key!r}") from None
+
+
+def normalize_entry(key, values):
+    entry = {}
+    for field, value in values.items():
+        if field in TEST_COUNTS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key}: {field} is not a count: {value!r}") from None
+        entry[field] = value
+    return entry
+
+
+def normalize(results):
+    """Return `results` keyed by ISO 8601 UTC dates, sorted, with int counts."""
+    entries = {}
+    for key, values in results.items():
+        when = parse_date(key)
+        if when.tzinfo is None:
+            raise ValueError(f"date without a timezone: {key!r}")
+        entries[when.astimezone(UTC)] = normalize_entry(key, values)
+    return {when.strftime(ISO_FORMAT): entries[when] for when in sorted(entries)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="+", help="result files to rewrite in place")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path) as f:
+            results = json.load(f)
+        try:
+            normalized = normalize(results)
+        except ValueError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+        with open(path, "w") as f:
+            json.dump(normalized, f, indent=2)
+            f.write("\n")
+        print(f"{path}: {len(results)} entries, {len(normalized)} after normalizing")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Render every tracking graph from one Python process.
+
+Each graph script exposes `main(argv)`. Running them all from here pays for
+importing pandas, matplotlib and seaborn, and for the theme and font setup,
+once instead of once per script. The output files are the same as when the
+scripts are run one by one.
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+from instrumentation import add_arguments, session, span
+
+# (script, arguments) in the order the graphs are rendered.
+JOBS = [
+    ("graph.py", ["gnu-result.json", "GNU"]),
+    ("graph.py", ["busybox-result.json", "BusyBox"]),
+    ("graph.py", ["toybox-result.json", "Toybox"]),
+    ("individual-size-graph.py", ["individual-size-result.json"]),
+    ("size-graph.py", ["size-result.json"]),
+    ("unsafe-graph.py", ["unsafe-result.json"]),
+    ("activity-graph.py", ["activity-result.json"]),
+]
+
+HERE = Path(__file__).resolve().parent
+
+
+def load_script(script: str):
+    """Import a graph script by file name (they are not valid module names)."""
+    name = Path(script).stem.replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, HERE / script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="SCRIPT",
+        help="only run the jobs of this graph script (repeatable)",
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with session("render_graphs", args.profile, args.timings):
+        for script, argv in JOBS:
+            if args.only and script not in args.only:
+                continue
+            job = f"{script} {' '.join(argv)}"
+            start = time.perf_counter()
+            with span(job):
+                status = load_script(script).main(argv)
+            print(f"{job}: {time.perf_counter() - start:.1f}s")
+            if status:
+                return status
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
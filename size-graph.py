@@ -5,104 +5,140 @@
 
 import sys
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-
 from graph_common import (
     COLORS,
+    RenderManifest,
     add_title,
     apply_smoothing,
+    cached_frame,
+    downsample,
+    parse_dates,
+    pyplot,
+    render_key,
+    save_figure,
+    seaborn,
     setup_theme,
     style_axes,
     style_legend,
 )
-
-d = pd.read_json(sys.argv[1], orient="index")
-df = pd.DataFrame(d)
-
-df.columns.names = ["date"]
-df.index = pd.to_datetime(df.index, utc=True, format="mixed")
-
-print(df)
-
-# Set up modern theme
-setup_theme()
-
-# Create figure with better proportions and higher DPI
-fig, ax = plt.subplots(figsize=(18, 9), dpi=100)
-
-# Prepare data for Seaborn - melt to long format
-df_plot = df[["size", "multisize"]].copy()
-df_plot = df_plot.reset_index()
-df_plot.columns = ["date", "size", "multisize"]
-df_plot_long = df_plot.melt(
-    id_vars="date", var_name="binary_type", value_name="size_kb"
-)
-
-# Convert to numeric
-df_plot_long["size_kb"] = pd.to_numeric(df_plot_long["size_kb"], errors="coerce")
-
-# Apply smoothing using rolling average
-df_plot_long["size_kb_smooth"] = apply_smoothing(df_plot_long, "binary_type", "size_kb")
-
-# Use color palette from common module
-palette = {"size": COLORS["size"], "multisize": COLORS["multisize"]}
-
-# Add gradient-like area fills first
-for col, color in palette.items():
-    if col in df_plot.columns:
-        ax.fill_between(
-            df_plot["date"],
-            0,
-            df_plot[col],
-            alpha=0.2,
-            color=color,
-            zorder=1,
-            linewidth=0,
+from instrumentation import session, span
+
+
+def parse(path):
+    import pandas as pd
+
+    d = pd.read_json(path, orient="index", convert_axes=False)
+    df = pd.DataFrame(d)
+
+    df.index = parse_dates(df.index)
+    return df
+
+
+def main(argv: list[str]) -> int:
+    df = cached_frame(argv[0], parse)
+    df.columns.names = ["date"]
+
+    print(df)
+
+    output = "size-results.svg"
+    manifest = RenderManifest()
+    key = render_key(__file__, df[["size", "multisize"]])
+    if manifest.is_current(output, key):
+        print(f"{output} is up to date")
+        return 0
+
+    import pandas as pd
+
+    plt = pyplot()
+    sns = seaborn()
+
+    # Set up modern theme
+    setup_theme()
+
+    # Create figure with better proportions and higher DPI
+    fig, ax = plt.subplots(figsize=(18, 9), dpi=100)
+
+    # Prepare data for Seaborn - melt to long format
+    df_plot = df[["size", "multisize"]].copy()
+    df_plot = df_plot.reset_index()
+    df_plot.columns = ["date", "size", "multisize"]
+    df_plot_long = df_plot.melt(
+        id_vars="date", var_name="binary_type", value_name="size_kb"
+    )
+
+    # Convert to numeric
+    df_plot_long["size_kb"] = pd.to_numeric(df_plot_long["size_kb"], errors="coerce")
+
+    # Apply smoothing using rolling average
+    df_plot_long["size_kb_smooth"] = apply_smoothing(
+        df_plot_long, "binary_type", "size_kb"
+    )
+
+    # Only draw the points that can show at this size
+    df_lines = downsample(df_plot_long, "date", "size_kb_smooth", "binary_type")
+    df_fills = downsample(df_plot, "date", ["size", "multisize"])
+
+    # Use color palette from common module
+    palette = {"size": COLORS["size"], "multisize": COLORS["multisize"]}
+
+    # Add gradient-like area fills first
+    for col, color in palette.items():
+        if col in df_plot.columns:
+            ax.fill_between(
+                df_fills["date"],
+                0,
+                df_fills[col],
+                alpha=0.2,
+                color=color,
+                zorder=1,
+                linewidth=0,
+            )
+
+    # Use Seaborn's lineplot with enhanced styling and smoothed data
+    with span("lineplot"):
+        sns.lineplot(
+            data=df_lines,
+            x="date",
+            y="size_kb_smooth",
+            hue="binary_type",
+            palette=palette,
+            linewidth=4,
+            ax=ax,
+            markers=False,  # Disable markers for smoother look
+            dashes=False,
+            alpha=1,
+            zorder=3,
         )
 
-# Use Seaborn's lineplot with enhanced styling and smoothed data
-sns.lineplot(
-    data=df_plot_long,
-    x="date",
-    y="size_kb_smooth",
-    hue="binary_type",
-    palette=palette,
-    linewidth=4,
-    ax=ax,
-    markers=False,  # Disable markers for smoother look
-    dashes=False,
-    alpha=1,
-    zorder=3,
-)
-
-# Add title and subtitle
-add_title(
-    ax,
-    "uutils coreutils — Binary Size Evolution",
-    "Tracking binary size optimization and comparing build strategies",
-)
-
-# Style axes with labels and grid
-style_axes(ax, xlabel="Date", ylabel="Size (kilobytes)")
-
-# Style legend
-handles, labels = ax.get_legend_handles_labels()
-label_map = {"size": "Multiple Binaries", "multisize": "Multicall Binary (Optimized)"}
-labels = [label_map.get(label, label) for label in labels]
-style_legend(ax, handles, labels, ncol=1, loc="upper left")
-
-# Tight layout
-plt.tight_layout()
-
-# Save with high quality
-plt.savefig(
-    "size-results.svg",
-    format="svg",
-    dpi=300,
-    bbox_inches="tight",
-    facecolor="white",
-    edgecolor="none",
-    metadata={"Creator": "uutils coreutils tracking", "Title": "Binary Size Evolution"},
-)
+    # Add title and subtitle
+    add_title(
+        ax,
+        "uutils coreutils — Binary Size Evolution",
+        "Tracking binary size optimization and comparing build strategies",
+    )
+
+    # Style axes with labels and grid
+    style_axes(ax, xlabel="Date", ylabel="Size (kilobytes)")
+
+    # Style legend
+    handles, labels = ax.get_legend_handles_labels()
+    label_map = {
+        "size": "Multiple Binaries",
+        "multisize": "Multicall Binary (Optimized)",
+    }
+    labels = [label_map.get(label, label) for label in labels]
+    style_legend(ax, handles, labels, ncol=1, loc="upper left")
+
+    # Tight layout
+    plt.tight_layout()
+
+    # Save with high quality
+    save_figure(fig, output, "Binary Size Evolution")
+    manifest.record(output, key)
+    manifest.save()
+    return 0
+
+
+if __name__ == "__main__":
+    with session("size-graph"):
+        sys.exit(main(sys.argv[1:]))
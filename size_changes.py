@@ -0,0 +1,118 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Rank the biggest size jumps of the individual utilities.
+
+individual-size-result.json is loaded as one utilities x runs matrix, NaN
+where a utility is missing from a run, and every utility is compared with
+its previous size in one pass (see find_size_jumps in graph_common.py). A
+jump is reported when a utility grew by at least --percent percent or
+--kilobytes kilobytes, together with the sha of the run that first had the
+new size and the sha of the run before it: the change that caused the jump
+is between the two.
+"""
+
+import argparse
+import json
+import sys
+
+from graph_common import (
+    SIZE_JUMP_KILOBYTES,
+    SIZE_JUMP_PERCENT,
+    find_size_jumps,
+    load_individual_sizes,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "json",
+        nargs="?",
+        default="individual-size-result.json",
+        help="individual size results (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--percent",
+        type=float,
+        default=SIZE_JUMP_PERCENT,
+        help="smallest growth to report, in percent (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--kilobytes",
+        type=float,
+        default=SIZE_JUMP_KILOBYTES,
+        help="smallest growth to report, in kilobytes (default: %(default)s)",
+    )
+    parser.add_argument("--shrinks", action="store_true", help="also report size drops")
+    parser.add_argument(
+        "--sort",
+        choices=["kilobytes", "percent"],
+        default="kilobytes",
+        help="what to rank the jumps by (default: %(default)s)",
+    )
+    parser.add_argument("--since", help="only report jumps from this ISO date on")
+    parser.add_argument(
+        "--top", type=int, default=30, help="rows to print, 0 for all (default: 30)"
+    )
+    parser.add_argument("--json-output", metavar="FILE", help="write all jumps here")
+    args = parser.parse_args()
+
+    try:
+        sizes, shas = load_individual_sizes(args.json)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    utilities = sizes.columns
+    dates = sizes.index.strftime("%Y-%m-%dT%H:%M:%SZ")
+    matrix = sizes.to_numpy(dtype=float).T
+    row, col, before_col, before, after = find_size_jumps(
+        matrix, args.percent, args.kilobytes, args.shrinks
+    )
+
+    jumps = []
+    for i in range(len(row)):
+        change = after[i] - before[i]
+        jumps.append(
+            {
+                "utility": utilities[row[i]],
+                "date": dates[col[i]],
+                "sha": shas.iloc[col[i]],
+                "previous_sha": shas.iloc[before_col[i]],
+                "before": float(before[i]),
+                "after": float(after[i]),
+                "kilobytes": float(change),
+                "percent": round(float(change * 100 / before[i]), 2)
+                if before[i]
+                else None,
+            }
+        )
+    if args.since:
+        jumps = [jump for jump in jumps if jump["date"] >= args.since]
+    jumps.sort(key=lambda jump: -abs(jump[args.sort] or 0))
+
+    shown = jumps[: args.top] if args.top else jumps
+    print(f"{len(jumps)} size jumps in {len(utilities)} utilities, {len(dates)} runs")
+    if shown:
+        print(
+            f"{'':>4} {'utility':12} {'date':20} {'before':>8} {'after':>8} "
+            f"{'change':>8} {'%':>7}  sha"
+        )
+    for rank, jump in enumerate(shown, 1):
+        percent = f"{jump['percent']:+.1f}" if jump["percent"] is not None else "-"
+        print(
+            f"{rank:>4} {jump['utility']:12} {jump['date']:20} "
+            f"{jump['before']:8.0f} {jump['after']:8.0f} {jump['kilobytes']:+8.0f} "
+            f"{percent:>7}  {jump['sha'] or ''}"
+        )
+    if args.json_output:
+        with open(args.json_output, "w") as f:
+            json.dump(jumps, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
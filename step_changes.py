@@ -0,0 +1,103 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Report the step changes in the test-suite results.
+
+A drop in the pass count, or a jump in the fail count, that lasts one run
+disappears in the smoothed lines of the graphs. This looks at every run of
+the given result files at once (see detect_steps in graph_common.py) and
+lists the runs where pass, fail, error or skip moved away from their recent
+level by more than the threshold and more than the usual noise.
+
+A "blip" is a change that is gone again at the next run, a "step" one that
+stays. Regressions are pass drops and fail or error rises.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from graph_common import (
+    STEP_NOISE,
+    STEP_THRESHOLD,
+    STEP_WINDOW,
+    find_steps,
+    load_test_results,
+)
+
+RESULT_FILES = ["gnu-result.json", "busybox-result.json", "toybox-result.json"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "files",
+        nargs="*",
+        default=RESULT_FILES,
+        help="result files (default: the GNU, busybox and toybox ones)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=STEP_THRESHOLD,
+        help="smallest change in tests to report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=STEP_WINDOW,
+        help="previous runs the level is taken from (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--noise",
+        type=float,
+        default=STEP_NOISE,
+        help="times the usual spread a change must exceed (default: %(default)s)",
+    )
+    parser.add_argument("--since", help="only report steps from this ISO date on")
+    parser.add_argument(
+        "--regressions", action="store_true", help="only report regressions"
+    )
+    parser.add_argument("--json", metavar="FILE", help="write the report here")
+    args = parser.parse_args()
+
+    try:
+        results = {Path(path).name: load_test_results(path) for path in args.files}
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    steps = find_steps(
+        results, threshold=args.threshold, window=args.window, noise=args.noise
+    )
+    if args.since:
+        steps = [step for step in steps if step["date"] >= args.since]
+    if args.regressions:
+        steps = [step for step in steps if step["regression"]]
+
+    for step in steps:
+        mark = "!" if step["regression"] else " "
+        print(
+            f"{step['date']} {mark} {step['name']:20} {step['metric']:5} "
+            f"{step['before']:6.0f} -> {step['after']:4.0f} "
+            f"({step['change']:+.0f}, {step['kind']})  {step['sha'] or ''}"
+        )
+    if args.json:
+        report = {
+            "settings": {
+                "threshold": args.threshold,
+                "window": args.window,
+                "noise": args.noise,
+            },
+            "steps": steps,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""Keep the per-test history of the GNU test suite.
+
+aggregated-result.json holds the status of every test of the latest run,
+`{util: {test: status}}`, and is overwritten by each run. This records the
+snapshots in test-history.json, keeping only the transitions:
+
+  times     the dates of the snapshots that changed something, oldest first
+  statuses  the status names; a status is stored as its index in this list
+  tests     for each `<util>/<test>`, a flat list of `time index, status`
+            pairs, one per change. Status -1 means the test was not in the
+            report any more.
+
+Commands:
+
+  record FILE [--date-from RESULT | --date DATE]
+                              add a snapshot, taken at the date of the last
+                              entry of RESULT, or at DATE (default: now)
+  backfill REPO               add every version of aggregated-result.json in
+                              the history of a checkout of this repository
+  show TEST...                the transitions of some tests
+  when TEST [--status S]      since when TEST has status S (default: PASS)
+  changes [--since DATE]      every transition since DATE
+  regressions [--since DATE]  tests that went from PASS to FAIL or ERROR
+
+Without --since, the last 7 days are looked at (see --days).
+
+A snapshot is dated with the GNU test run it comes from: the key of the last
+entry of gnu-result.json, which the workflow updates along with the report.
+`record --date-from dl/gnu-result.json` takes it from the downloaded result,
+and `backfill` from gnu-result.json at each commit. A snapshot that is not
+newer than the last one recorded is skipped.
+"""
+
+import argparse
+import bisect
+import json
+import os
+import subprocess
+import sys
+from datetime import UTC, datetime, timedelta
+
+from normalize_results import ISO_FORMAT, parse_date
+
+HISTORY_FILE = "test-history.json"
+
+# The result file whose last key dates a snapshot.
+DATE_FILE = "gnu-result.json"
+
+HISTORY_VERSION = 1
+
+# Stored for a test that disappeared from the report.
+ABSENT = -1
+
+# A test regressed when it goes from one of REGRESSION_FROM to one of
+# REGRESSION_TO. SKIP does not count: it mostly depends on the CI machine.
+REGRESSION_FROM = {"PASS"}
+REGRESSION_TO = {"FAIL", "ERROR"}
+
+
+def iso_date(value):
+    """Parse a date argument to the ISO 8601 UTC form of the time index.
+
+    Dates without a timezone are taken to be UTC.
+    """
+    when = parse_date(value)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return when.astimezone(UTC).strftime(ISO_FORMAT)
+
+
+def last_key_date(results):
+    """The date of the last entry of a result file, as `iso_date` gives it.
+
+    Entries are appended as the runs come in, so the last one is the run the
+    report next to it was made by.
+    """
+    if not isinstance(results, dict) or not results:
+        raise ValueError("expected a non-empty result object")
+    return iso_date(next(reversed(results)))
+
+
+def flatten(report):
+    """`{util: {test: status}}` to `{"util/test": status}`."""
+    if not isinstance(report, dict):
+        raise TypeError("expected an object mapping utilities to tests")
+    return {
+        f"{util}/{test}": status
+        for util, tests in report.items()
+        for test, status in tests.items()
+    }
+
+
+class TestHistory:
+    """The transitions of every test, as loaded from test-history.json."""
+
+    def __init__(self, times=None, statuses=None, tests=None):
+        self.times = times or []
+        self.statuses = statuses or []
+        self.tests = tests or {}
+        self.codes = {status: code for code, status in enumerate(self.statuses)}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != HISTORY_VERSION:
+            raise ValueError(f"{path}: unsupported version {data.get('version')!r}")
+        return cls(data["times"], data["statuses"], data["tests"])
+
+    def save(self, path):
+        """Write the history, one date and one test per line so it diffs well."""
+        times = ",\n".join(f"    {json.dumps(date)}" for date in self.times)
+        tests = ",\n".join(
+            f"    {json.dumps(test)}: {json.dumps(self.tests[test])}"
+            for test in sorted(self.tests)
+        )
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(f'{{\n  "version": {HISTORY_VERSION},\n')
+            f.write(f'  "statuses": {json.dumps(self.statuses)},\n')
+            f.write(f'  "times": [\n{times}\n  ],\n')
+            f.write(f'  "tests": {{\n{tests}\n  }}\n}}\n')
+        os.replace(tmp, path)
+
+    def code(self, status):
+        if status not in self.codes:
+            self.codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        return self.codes[status]
+
+    def status_name(self, code):
+        return "ABSENT" if code == ABSENT else self.statuses[code]
+
+    def current(self, test):
+        """Latest status code of `test`, ABSENT if it was never seen."""
+        changes = self.tests.get(test)
+        return changes[-1] if changes else ABSENT
+
+    def record(self, date, report):
+        """Add the snapshot `report` (`{"util/test": status}`) taken at `date`.
+
+        Returns:
+            the number of tests whose status changed; nothing is stored when
+            there is none
+
+        Raises:
+            ValueError: if `date` is not after the last recorded change
+        """
+        changed = {}
+        for test, status in report.items():
+            code = self.code(status)
+            if self.current(test) != code:
+                changed[test] = code
+        for test in self.tests:
+            if test not in report and self.current(test) != ABSENT:
+                changed[test] = ABSENT
+        if not changed:
+            return 0
+        if self.times and date <= self.times[-1]:
+            raise ValueError(f"{date} is not after the last change, {self.times[-1]}")
+
+        index = len(self.times)
+        self.times.append(date)
+        for test, code in changed.items():
+            self.tests.setdefault(test, []).extend((index, code))
+        return len(changed)
+
+    def transitions(self, test):
+        """`(date, old status, new status)` for each change of `test`."""
+        changes = self.tests.get(test, [])
+        old = ABSENT
+        for i in range(0, len(changes), 2):
+            index, new = changes[i], changes[i + 1]
+            yield self.times[index], self.status_name(old), self.status_name(new)
+            old = new
+
+    def since(self, test, status):
+        """Date from which `test` has had `status` without a break, or None."""
+        changes = self.tests.get(test, [])
+        if not changes or self.status_name(changes[-1]) != status:
+            return None
+        return self.times[changes[-2]]
+
+    def changes_since(self, date):
+        """`(date, test, old status, new status)` of every change at or after `date`.
+
+        Changes are sorted by date, then by test.
+        """
+        first = bisect.bisect_left(self.times, date)
+        found = []
+        for test, changes in self.tests.items():
+            # The time indexes of a test only grow, so scan from the end.
+            i = len(changes) - 2
+            while i >= 0 and changes[i] >= first:
+                i -= 2
+            old = changes[i + 1] if i >= 0 else ABSENT
+            for j in range(i + 2, len(changes), 2):
+                new = changes[j + 1]
+                found.append(
+                    (
+                        self.times[changes[j]],
+                        test,
+                        self.status_name(old),
+                        self.status_name(new),
+                    )
+                )
+                old = new
+        return sorted(found)
+
+    def regressions_since(self, date):
+        return [
+            change
+            for change in self.changes_since(date)
+            if change[2] in REGRESSION_FROM and change[3] in REGRESSION_TO
+        ]
+
+
+def git_snapshots(repo, path, date_path=DATE_FILE):
+    """`(run date, report)` for every commit of `repo` that changed `path`.
+
+    The run date is the last key of `date_path` at the same commit.
+    """
+    # Only needed here; the queries should not have to import it.
+    from unsafe_count import BlobReader
+
+    commits = subprocess.run(
+        ["git", "-C", repo, "log", "--reverse", "--format=%H", "--", path],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    names = [f"{sha}:{name}" for sha in commits for name in (path, date_path)]
+    with BlobReader(repo) as reader:
+        blobs = reader.read(names)
+        # The blobs come in the order of `names`: a report, then its dates.
+        for (name, data), (_, dates) in zip(blobs, blobs, strict=True):
+            if data is None:
+                continue  # the commit deleted the file
+            try:
+                report = flatten(json.loads(data))
+            except (TypeError, ValueError, AttributeError):
+                print(f"skipping {name}: not a test report", file=sys.stderr)
+                continue
+            try:
+                date = last_key_date(json.loads(dates or b"null"))
+            except ValueError:
+                print(f"skipping {name}: no run date in {date_path}", file=sys.stderr)
+                continue
+            yield date, report
+
+
+def print_changes(changes):
+    for date, test, old, new in changes:
+        print(f"{date}  {test:40} {old} -> {new}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--history",
+        default=HISTORY_FILE,
+        help=f"history file (default: {HISTORY_FILE})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="add a snapshot")
+    record.add_argument("report", help="an aggregated-result.json")
+    dates = record.add_mutually_exclusive_group()
+    dates.add_argument(
+        "--date-from",
+        metavar="RESULT",
+        help=f"date the snapshot with the last entry of this {DATE_FILE}",
+    )
+    dates.add_argument("--date", help="when the snapshot was taken (default: now)")
+
+    backfill = commands.add_parser("backfill", help="add snapshots from git history")
+    backfill.add_argument("repo", help="a checkout of this repository")
+    backfill.add_argument(
+        "--path",
+        default="aggregated-result.json",
+        help="the report in that checkout (default: %(default)s)",
+    )
+
+    show = commands.add_parser("show", help="transitions of some tests")
+    show.add_argument("tests", nargs="+", metavar="TEST", help="e.g. cat/splice.log")
+
+    when = commands.add_parser("when", help="since when a test has a status")
+    when.add_argument("test", help="e.g. cat/splice.log")
+    when.add_argument("--status", default="PASS", help="default: %(default)s")
+
+    for name in ("changes", "regressions"):
+        query = commands.add_parser(name, help=f"{name} in a time range")
+        query.add_argument("--since", help="start date (default: see --days)")
+        query.add_argument(
+            "--days", type=int, default=7, help="the last DAYS days (default: 7)"
+        )
+        query.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    try:
+        history = TestHistory.load(args.history)
+        if args.command == "record":
+            with open(args.report) as f:
+                report = flatten(json.load(f))
+            if args.date_from:
+                with open(args.date_from) as f:
+                    date = last_key_date(json.load(f))
+            elif args.date:
+                date = iso_date(args.date)
+            else:
+                date = datetime.now(UTC).strftime(ISO_FORMAT)
+            if history.times and date <= history.times[-1]:
+                # E.g. the same run downloaded again; not worth failing CI for.
+                print(
+                    f"{args.history}: skipping the snapshot of {date}, not after "
+                    f"the last one, {history.times[-1]}",
+                    file=sys.stderr,
+                )
+                return 0
+            changed = history.record(date, report)
+            history.save(args.history)
+            print(f"{args.history}: {date}, {changed} of {len(report)} tests changed")
+        elif args.command == "backfill":
+            snapshots = changed = 0
+            for date, report in git_snapshots(args.repo, args.path):
+                if history.times and date <= history.times[-1]:
+                    continue  # already recorded
+                snapshots += 1
+                changed += history.record(date, report)
+            history.save(args.history)
+            print(f"{args.history}: {snapshots} snapshots, {changed} changes")
+        elif args.command == "show":
+            for test in args.tests:
+                print(test)
+                for date, old, new in history.transitions(test):
+                    print(f"  {date}  {old} -> {new}")
+        elif args.command == "when":
+            date = history.since(args.test, args.status)
+            if date is None:
+                current = history.status_name(history.current(args.test))
+                print(f"{args.test} is {current}, not {args.status}")
+                return 1
+            print(f"{args.test} is {args.status} since {date}")
+        else:
+            if args.since:
+                since = iso_date(args.since)
+            else:
+                start = datetime.now(UTC) - timedelta(days=args.days)
+                since = start.strftime(ISO_FORMAT)
+            if args.command == "changes":
+                found = history.changes_since(since)
+            else:
+                found = history.regressions_since(since)
+            if args.json:
+                keys = ("date", "test", "from", "to")
+                json.dump([dict(zip(keys, c, strict=True)) for c in found], sys.stdout)
+                print()
+            else:
+                print_changes(found)
+    except (OSError, TypeError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"{args.history}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
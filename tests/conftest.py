@@ -0,0 +1,10 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+import sys
+from pathlib import Path
+
+# The scripts are top-level modules, not a package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,73 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""The Agg backend is picked before anything loads matplotlib.pyplot.
+
+Each case runs in a fresh interpreter, with matplotlib.use() wrapped so it
+fails if pyplot (which seaborn imports too) is already loaded.
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import render_graphs
+
+HERE = Path(__file__).resolve().parent.parent
+
+CHECK_ORDER = """
+import sys
+import matplotlib
+
+real_use = matplotlib.use
+
+
+def use(*args, **kwargs):
+    assert "matplotlib.pyplot" not in sys.modules, "pyplot loaded before use()"
+    matplotlib.use = real_use
+    real_use(*args, **kwargs)
+
+
+matplotlib.use = use
+sys.path.insert(0, {here!r})
+"""
+
+
+def run(code, cwd=None):
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK_ORDER.format(here=str(HERE)) + code],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "graph_common.setup_theme()",
+        "graph_common.seaborn()",
+        "graph_common.style_axes(graph_common.pyplot().subplots()[1])",
+    ],
+)
+def test_graph_common(code):
+    run(f"import graph_common\n{code}\n")
+
+
+@pytest.mark.parametrize("script, argv", render_graphs.JOBS)
+def test_graph_scripts(script, argv, tmp_path):
+    if not (HERE / argv[0]).exists():
+        pytest.skip(f"no {argv[0]}")
+    shutil.copy(HERE / argv[0], tmp_path)
+    run(
+        "import render_graphs\n"
+        f"sys.exit(render_graphs.load_script({script!r}).main({argv!r}))\n",
+        cwd=tmp_path,
+    )
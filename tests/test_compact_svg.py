@@ -0,0 +1,106 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""compact_svg against the full SVG matplotlib writes for the same figure.
+
+The compact file must look the same: both are rasterized at the DPI the
+graphs are saved with and compared pixel by pixel.
+"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import graph_common
+
+# Rasterizing at 300 DPI, text is antialiased a bit differently when drawn
+# from a font than from the glyph outlines of the full SVG, and the
+# simplified lines move by up to COMPACT_TOLERANCE points. Pixels off by
+# more than PIXEL_THRESHOLD (of 255) in some channel count as different.
+PIXEL_THRESHOLD = 32
+MAX_DIFFERENT = 0.01
+
+DPI = 300
+
+
+def draw(path):
+    """A small graph with what the real ones have: long lines, fills, labels."""
+    plt = graph_common.pyplot()
+    graph_common.setup_theme()
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2021-01-01", periods=1500, freq="D")
+    total = np.cumsum(rng.integers(0, 3, len(dates))) + 100
+    code = (total * 0.7).round()
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+    lines = [
+        ax.plot(dates, total, color="#0066CC", linewidth=1.5)[0],
+        ax.plot(dates, code, color="#10B981", linewidth=1.5)[0],
+    ]
+    ax.fill_between(dates, 0, code, color="#10B981", alpha=0.1)
+    graph_common.style_axes(ax, ylabel="Occurrences")
+    graph_common.add_title(ax, "Compact SVG", "pixel comparison")
+    graph_common.style_legend(ax, lines, ["Total", "Code"])
+    graph_common.save_figure(fig, path, "Compact SVG")
+
+
+def rasterize(path):
+    resvg_py = pytest.importorskip("resvg_py")
+    image = pytest.importorskip("PIL.Image")
+    png = bytes(resvg_py.svg_to_bytes(svg_path=str(path), dpi=DPI))
+    return np.asarray(image.open(io.BytesIO(png)).convert("RGB"), dtype=np.int16)
+
+
+@pytest.fixture(scope="module")
+def svgs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("svg")
+    paths = {}
+    for compact in (False, True):
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(graph_common, "COMPACT_SVG", compact)
+            paths[compact] = directory / f"compact-{compact}.svg"
+            draw(paths[compact])
+    return paths[False], paths[True]
+
+
+def test_compact_is_smaller(svgs):
+    full, compact = svgs
+    assert compact.stat().st_size * 3 < full.stat().st_size
+
+
+def test_compact_is_valid(svgs):
+    _, compact = svgs
+    text = compact.read_text()
+    ET.fromstring(text.encode())
+    # Every reference still has its target.
+    defined = set(re.findall(r'\bid="([^"]+)"', text))
+    assert set(re.findall(r'(?:url\(|href=")#([^)"]+)', text)) <= defined
+    for name in re.findall(r'\bclass="([^"]+)"', text):
+        assert f"\n.{name}{{" in text
+
+
+def test_compact_looks_the_same(svgs):
+    full, compact = (rasterize(path) for path in svgs)
+    assert full.shape == compact.shape
+    different = np.abs(full - compact).max(axis=2) > PIXEL_THRESHOLD
+    assert different.mean() < MAX_DIFFERENT
+
+
+def test_unwrap_groups_keeps_nesting():
+    svg = '<g id="a"><g><path d="M0 0"/><g/></g><g clip-path="url(#c)"><g></g></g></g>'
+    assert graph_common._unwrap_groups(svg) == (
+        '<g id="a"><path d="M0 0"/><g clip-path="url(#c)"></g></g>'
+    )
+
+
+def test_class_names_are_unique():
+    names = [graph_common._class_name(i) for i in range(26 * 27 + 5)]
+    assert len(set(names)) == len(names)
+    assert names[:3] == ["a", "b", "c"]
+    assert names[26] == "aa"
@@ -0,0 +1,34 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""load_individual_sizes on a result file that is not in date order."""
+
+import json
+
+import numpy as np
+
+from graph_common import find_size_jumps, load_individual_sizes
+
+# In file order: the second run is the latest, where ls grew.
+RUNS = {
+    "2024-01-01T00:00:00Z": {"sha": "aaa", "sizes": {"ls": 100, "cat": 50}},
+    "2024-01-03T00:00:00Z": {"sha": "ccc", "sizes": {"ls": 200, "cat": 50}},
+    "Tue, 02 Jan 2024 00:00:00 +0000": {"sha": "bbb", "sizes": {"ls": 101}},
+}
+
+
+def test_sorted_by_date(tmp_path):
+    path = tmp_path / "individual-size-result.json"
+    path.write_text(json.dumps(RUNS))
+    sizes, shas = load_individual_sizes(str(path))
+    assert sizes.index.is_monotonic_increasing
+    assert list(shas) == ["aaa", "bbb", "ccc"]
+    assert np.isnan(sizes.loc[sizes.index[1], "cat"])
+
+    row, col, before_col, before, after = find_size_jumps(sizes.T.to_numpy())
+    assert [sizes.columns[r] for r in row] == ["ls"]
+    assert shas.iloc[col[0]] == "ccc"
+    assert shas.iloc[before_col[0]] == "bbb"
+    assert (before[0], after[0]) == (101, 200)
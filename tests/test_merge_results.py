@@ -0,0 +1,182 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""merge() against a jq-style deep merge, and when it appends or rewrites."""
+
+import json
+
+import pytest
+
+import merge_results
+from merge_results import deep_merge, merge, validate
+
+
+def dates(n, start=0):
+    """`n` consecutive ISO dates, a day apart."""
+    return [
+        f"2024-{1 + (start + i) // 28:02d}-{1 + (start + i) % 28:02d}T00:00:00Z"
+        for i in range(n)
+    ]
+
+
+def expected_merge(existing, incoming):
+    """What `jq -s '.[0] * .[1]'` then sorting by date gives."""
+    merged = dict(existing)
+    for key, entry in incoming.items():
+        merged[key] = deep_merge(merged.get(key, {}), entry)
+    return dict(sorted(merged.items(), key=lambda item: item[0]))
+
+
+@pytest.fixture
+def result_file(tmp_path):
+    path = str(tmp_path / "result.json")
+    existing = {
+        key: {"total": i, "sizes": {"ls": i}} for i, key in enumerate(dates(30))
+    }
+    merge_results.write_results(path, existing)
+    return path, existing
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_deep_merge_like_jq():
+    old = {"total": 1, "sizes": {"ls": 1, "cat": 2}, "sha": "a"}
+    new = {"sizes": {"ls": 3}, "sha": "b", "comment": "x"}
+    assert deep_merge(old, new) == {
+        "total": 1,
+        "sizes": {"ls": 3, "cat": 2},
+        "sha": "b",
+        "comment": "x",
+    }
+    # Only objects are merged; other values are replaced.
+    assert deep_merge({"a": [1]}, {"a": {"b": 1}}) == {"a": {"b": 1}}
+    assert deep_merge({"a": {"b": 1}}, {"a": 2}) == {"a": 2}
+
+
+def test_appends_newer_entries(result_file):
+    path, existing = result_file
+    incoming = {key: {"total": 99} for key in reversed(dates(2, start=30))}
+    assert merge(path, incoming) == "appended"
+    assert read(path) == expected_merge(existing, incoming)
+    # Byte for byte what a rewrite gives.
+    with open(path) as f:
+        appended = f.read()
+    merge_results.write_results(path, read(path))
+    with open(path) as f:
+        assert f.read() == appended
+
+
+def test_append_reads_only_the_tail(tmp_path, monkeypatch):
+    path = str(tmp_path / "result.json")
+    keys = [f"2024-01-01T00:00:00.{i:06d}Z" for i in range(5000)]
+    merge_results.write_results(path, {key: {"total": 1} for key in keys})
+    parsed = []
+    monkeypatch.setattr(
+        merge_results, "sort_key", lambda key: parsed.append(key) or (key, key)
+    )
+    monkeypatch.setattr(merge_results, "TAIL_SIZE", 100)
+    assert merge(path, {"2024-01-02T00:00:00Z": {"total": 1}}) == "appended"
+    # Only the incoming key and the few keys in the last 100 bytes.
+    assert 3 <= len(parsed) < 10
+
+
+@pytest.mark.parametrize(
+    "incoming",
+    [
+        # An update of an existing entry.
+        {dates(30)[-1]: {"sizes": {"cat": 5}}},
+        {dates(30)[3]: {"total": 7}},
+        # An entry older than the last one.
+        {"2023-12-31T00:00:00Z": {"total": 0}},
+        # Newer and older entries at once.
+        {"2023-12-31T00:00:00Z": {"total": 0}, dates(1, start=40)[0]: {"total": 1}},
+    ],
+)
+def test_rewrites_updates_and_older_entries(result_file, incoming):
+    path, existing = result_file
+    assert merge(path, incoming) == "rewrote"
+    assert read(path) == expected_merge(existing, incoming)
+    assert list(read(path)) == sorted(read(path))
+
+
+def test_rewrites_a_file_out_of_order(tmp_path):
+    path = str(tmp_path / "result.json")
+    keys = dates(5)
+    existing = {keys[0]: {"a": 1}, keys[2]: {"a": 2}, keys[1]: {"a": 3}}
+    merge_results.write_results(path, existing)
+    incoming = {keys[4]: {"a": 4}}
+    assert merge(path, incoming) == "rewrote"
+    assert list(read(path)) == [keys[0], keys[1], keys[2], keys[4]]
+    # Sorted now, so the next one is appended.
+    assert merge(path, {dates(1, start=9)[0]: {"a": 5}}) == "appended"
+
+
+def test_rewrites_a_file_not_written_by_this_tool(tmp_path):
+    path = tmp_path / "result.json"
+    keys = dates(3)
+    path.write_text(json.dumps({keys[0]: {"a": 1}, keys[1]: {"a": 2}}))
+    assert merge(str(path), {keys[2]: {"a": 3}}) == "rewrote"
+    assert read(path) == {keys[0]: {"a": 1}, keys[1]: {"a": 2}, keys[2]: {"a": 3}}
+
+
+def test_mixed_date_formats_sort_by_time(tmp_path):
+    path = str(tmp_path / "result.json")
+    merge_results.write_results(path, {"Tue, 02 Jan 2024 10:00:00 +0200": {"a": 1}})
+    # 08:00Z is after 10:00+02:00 (08:00Z) by one second.
+    assert merge(path, {"2024-01-02T08:00:01Z": {"a": 2}}) == "appended"
+    assert merge(path, {"2024-01-02T07:00:00Z": {"a": 3}}) == "rewrote"
+    assert list(read(path)) == [
+        "2024-01-02T07:00:00Z",
+        "Tue, 02 Jan 2024 10:00:00 +0200",
+        "2024-01-02T08:00:01Z",
+    ]
+
+
+def test_new_file(tmp_path):
+    path = str(tmp_path / "result.json")
+    incoming = {key: {"a": 1} for key in reversed(dates(2))}
+    assert merge(path, incoming) == "rewrote"
+    assert list(read(path)) == dates(2)
+
+
+@pytest.mark.parametrize(
+    "incoming, error",
+    [
+        ([], TypeError),
+        ({"yesterday": {"a": 1}}, ValueError),
+        ({"2024-01-01T00:00:00": {"a": 1}}, ValueError),
+        ({"2024-01-01T00:00:00Z": {}}, ValueError),
+        ({"2024-01-01T00:00:00Z": [1]}, ValueError),
+        ({"2024-01-01T00:00:00Z": {"a": 1}, "2024-01-02T00:00:00Z": None}, ValueError),
+    ],
+)
+def test_validate_rejects(incoming, error):
+    with pytest.raises(error):
+        validate(incoming)
+
+
+def test_validate_accepts_both_date_formats():
+    validate({})
+    validate(
+        {
+            "2024-01-01T00:00:00Z": {"a": 1},
+            "Tue, 02 Jan 2024 10:00:00 +0200": {"a": 2},
+        }
+    )
+
+
+def test_main_rejects_bad_input(tmp_path, monkeypatch, capsys):
+    result = tmp_path / "result.json"
+    merge_results.write_results(str(result), {dates(1)[0]: {"a": 1}})
+    before = result.read_text()
+    incoming = tmp_path / "incoming.json"
+    incoming.write_text(json.dumps({"2024-05-01T00:00:00": {"a": 2}}))
+    monkeypatch.setattr("sys.argv", ["merge_results.py", str(result), str(incoming)])
+    assert merge_results.main() == 1
+    assert "timezone" in capsys.readouterr().err
+    assert result.read_text() == before
@@ -0,0 +1,88 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""apply_smoothing against smoothing each group with its own rolling().
+
+The single rolling pass over all groups must give the values the original
+groupby().transform() gave.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from graph_common import apply_smoothing
+
+
+def baseline_smoothing(df, group_col, value_col, window):
+    """The original implementation, one rolling() per group."""
+    return df.groupby(group_col)[value_col].transform(
+        lambda x: x.rolling(window=window, min_periods=1, center=True).mean()
+    )
+
+
+def make_frame(sizes, seed, nan_fraction=0.0, nan_groups=0):
+    """Rows of groups with `sizes` rows each, interleaved, with some NaNs."""
+    rng = np.random.default_rng(seed)
+    groups = np.repeat([f"util{i}" for i in range(len(sizes))], sizes).astype(object)
+    values = rng.normal(1000, 200, len(groups))
+    values[rng.random(len(groups)) < nan_fraction] = np.nan
+    groups[rng.permutation(len(groups))[:nan_groups]] = None
+    order = rng.permutation(len(groups))
+    # A non-default index, as a filtered frame would have.
+    index = rng.permutation(len(groups)) * 3 + 7
+    return pd.DataFrame(
+        {"util": groups[order], "size": values[order]}, index=index[order]
+    )
+
+
+def check(df, window):
+    expected = baseline_smoothing(df, "util", "size", window)
+    actual = apply_smoothing(df, "util", "size", window)
+    assert actual.index.equals(df.index)
+    np.testing.assert_allclose(
+        actual.to_numpy(), expected.to_numpy(), rtol=1e-12, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 4, 15, 16])
+def test_unequal_group_lengths(window):
+    check(make_frame([1, 2, 5, 14, 15, 16, 40, 300], seed=window), window)
+
+
+@pytest.mark.parametrize("window", [3, 15])
+def test_nans_inside_groups(window):
+    df = make_frame([3, 20, 100, 250], seed=1, nan_fraction=0.2)
+    # A group that is all NaN, and a run of NaNs longer than the window.
+    df.loc[df["util"] == "util0", "size"] = np.nan
+    big = df.index[df["util"] == "util3"]
+    df.loc[big[10:40], "size"] = np.nan
+    check(df, window)
+
+
+@pytest.mark.parametrize("window", [15, 31])
+def test_groups_shorter_than_the_window(window):
+    check(make_frame([1, 2, 3, 7, 14], seed=2), window)
+
+
+def test_rows_without_a_group():
+    check(make_frame([5, 30, 60], seed=3, nan_fraction=0.1, nan_groups=6), 15)
+
+
+def test_sorted_frame_with_default_index():
+    df = pd.DataFrame(
+        {
+            "util": np.repeat(["a", "b", "c"], [40, 3, 25]),
+            "size": np.arange(68, dtype=float) ** 1.5,
+        }
+    )
+    check(df, 15)
+
+
+def test_without_groups():
+    df = make_frame([50], seed=5, nan_fraction=0.1)
+    expected = df["size"].rolling(15, min_periods=1, center=True).mean()
+    actual = apply_smoothing(df, None, "size", 15)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, equal_nan=True)
@@ -0,0 +1,93 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""record and backfill date the snapshots the same way, by the GNU run."""
+
+import json
+import subprocess
+
+import pytest
+
+import test_history
+from test_history import last_key_date
+
+REPORT_1 = {"cat": {"a.log": "PASS", "b.log": "FAIL"}}
+REPORT_2 = {"cat": {"a.log": "FAIL", "b.log": "FAIL"}}
+
+RESULTS_1 = {
+    "Tue, 20 Apr 2021 16:06:13 +0200": {"total": "2"},
+    "Wed, 21 Apr 2021 03:00:00 +0000": {"total": "2"},
+}
+RESULTS_2 = {**RESULTS_1, "2021-04-22T05:00:00Z": {"total": 2}}
+
+
+def test_last_key_date():
+    assert last_key_date(RESULTS_1) == "2021-04-21T03:00:00Z"
+    assert last_key_date(RESULTS_2) == "2021-04-22T05:00:00Z"
+    with pytest.raises(ValueError):
+        last_key_date({})
+
+
+def write(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def record(tmp_path, monkeypatch, report, results):
+    argv = [
+        "test_history.py",
+        "--history",
+        str(tmp_path / "history.json"),
+        "record",
+        write(tmp_path / "report.json", report),
+        "--date-from",
+        write(tmp_path / "results.json", results),
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    return test_history.main()
+
+
+def test_record_dates_by_the_run(tmp_path, monkeypatch):
+    assert record(tmp_path, monkeypatch, REPORT_1, RESULTS_1) == 0
+    assert record(tmp_path, monkeypatch, REPORT_2, RESULTS_2) == 0
+    history = test_history.TestHistory.load(str(tmp_path / "history.json"))
+    assert history.times == ["2021-04-21T03:00:00Z", "2021-04-22T05:00:00Z"]
+    assert history.since("cat/a.log", "FAIL") == "2021-04-22T05:00:00Z"
+
+
+def test_record_skips_older_snapshots(tmp_path, monkeypatch, capsys):
+    assert record(tmp_path, monkeypatch, REPORT_1, RESULTS_2) == 0
+    # A changed report dated before the last snapshot does not fail the step.
+    assert record(tmp_path, monkeypatch, REPORT_2, RESULTS_1) == 0
+    assert "skipping" in capsys.readouterr().err
+    history = test_history.TestHistory.load(str(tmp_path / "history.json"))
+    assert history.times == ["2021-04-22T05:00:00Z"]
+
+
+def test_backfill_then_record(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    run = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    for report, results in [(REPORT_1, RESULTS_1), (REPORT_2, RESULTS_2)]:
+        write(repo / "aggregated-result.json", report)
+        write(repo / "gnu-result.json", results)
+        subprocess.run([*run, "add", "."], check=True)
+        subprocess.run([*run, "commit", "-q", "-m", "data"], check=True)
+
+    history_path = str(tmp_path / "history.json")
+    argv = ["test_history.py", "--history", history_path, "backfill", str(repo)]
+    monkeypatch.setattr("sys.argv", argv)
+    assert test_history.main() == 0
+    history = test_history.TestHistory.load(history_path)
+    # The run dates, not the (much later) commit dates.
+    assert history.times == ["2021-04-21T03:00:00Z", "2021-04-22T05:00:00Z"]
+
+    # The next run records after them.
+    results = {**RESULTS_2, "2021-04-23T05:00:00Z": {"total": 2}}
+    assert record(tmp_path, monkeypatch, REPORT_1, results) == 0
+    assert (
+        test_history.TestHistory.load(history_path).times[-1] == "2021-04-23T05:00:00Z"
+    )
@@ -0,0 +1,302 @@
+# This file is part of the uutils coreutils package.
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+"""scan_blob and count_at against the original one-pattern-at-a-time scanner.
+
+The one-pass UNSAFE_TOKEN scan must give exactly the counts the per-pattern
+loop gave, or the history in unsafe-result.json would change meaning.
+"""
+
+import os
+import random
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import unsafe_count
+from unsafe_count import TYPE_PATTERNS, TYPES, count_at, scan_blob
+
+# Lines that exercise the precedence between the patterns, comments, and
+# near misses. Several hold more than one kind of `unsafe`.
+FIXTURE_LINES = [
+    "fn main() {",
+    "    let n = unsafe { libc::getpid() };",
+    "    unsafe{ ptr.read() }",
+    "    unsafe",
+    "    {",
+    "unsafe fn raw(ptr: *const u8) -> u8 {",
+    "pub(crate) unsafe fn f() { unsafe { g() } }",
+    "unsafe impl Send for Handle {}",
+    "unsafe impl<T> Sync for Wrapper<T> where T: Sync {}",
+    "pub unsafe trait Zeroable {}",
+    'unsafe extern "C" {',
+    'unsafe extern "C" fn callback() {}',
+    "#[unsafe(no_mangle)]",
+    '#[unsafe(export_name = "x")] pub unsafe fn exported() {}',
+    "    // unsafe { commented out }",
+    "    /* unsafe fn in a block comment",
+    "     * unsafe impl inside the comment",
+    "     */ unsafe { after_comment() }",
+    "#![deny(unsafe_code)]",
+    "#![forbid(unsafe_op_in_unsafe_fn)]",
+    "let unsafe_thing = 1;",
+    'let s = "unsafe { in a string }";',
+    "    unsafe  \t {",
+    "unsafe\tfn tabbed() {}",
+    "unsafe fnord()",
+    "impl unsafe_trait for X {}",
+    "    let v = unsafe { a() } + unsafe { b() };",
+    "unsafe trait T {} unsafe impl T for U {}",
+    "\tunsafe {\r",
+    "café unsafe { ünïcode() }",
+    "}",
+]
+
+FIXTURE_BLOBS = {
+    "src/uu/cat/src/splice.rs": "\n".join(FIXTURE_LINES[:15]),
+    "src/uu/ls/src/ls.rs": "\n".join(FIXTURE_LINES[10:]) + "\n",
+    "src/uucore/src/lib/features/fs.rs": "\r\n".join(FIXTURE_LINES),
+    "tests/by-util/test_cat.rs": "\n".join(reversed(FIXTURE_LINES)),
+    "fuzz/fuzz_targets/fuzz_date.rs": "unsafe { x() }\n// unsafe fn\n",
+    "src/uu/true/src/true.rs": "fn main() {}\n",
+    "vendor/foo/src/lib.rs": "unsafe { not_counted() }\n",
+    "src/uu/dd/target/gen.rs": "unsafe { not_counted() }\n",
+    "src/uu/dd/src/notes.txt": "unsafe { not_rust() }\n",
+}
+
+
+def baseline_scan(blob: str) -> dict[str, int]:
+    """The per-line loop of the original `count_at`."""
+    counts = {t: 0 for t in TYPES}
+    for line in blob.splitlines():
+        stripped = line.lstrip()
+        if stripped.startswith(("//", "*")):
+            continue
+        for type_name, regex in TYPE_PATTERNS:
+            if regex.search(line):
+                counts[type_name] += 1
+                break
+    return counts
+
+
+def baseline_count_at(repo: str, sha: str) -> dict[str, int]:
+    """The original `count_at`, one `git show` and six searches per line."""
+    counts = {t: 0 for t in TYPES}
+    counts["code"] = 0
+    counts["test"] = 0
+
+    files = unsafe_count.git(repo, "ls-tree", "-r", "--name-only", sha).splitlines()
+    rs_files = [
+        f
+        for f in files
+        if f.endswith(".rs")
+        and not f.startswith("vendor/")
+        and "/vendor/" not in f
+        and not f.startswith("target/")
+        and "/target/" not in f
+    ]
+    for path in rs_files:
+        location = "test" if unsafe_count.is_test_path(path) else "code"
+        blob = unsafe_count.git(repo, "show", f"{sha}:{path}")
+        for type_name, n in baseline_scan(blob).items():
+            counts[type_name] += n
+            counts[location] += n
+    return counts
+
+
+def random_blob(rng: random.Random) -> str:
+    pieces = ["unsafe", " ", "\t", "{", "(", "fn", "impl", "trait", "extern"]
+    pieces += ["#[", "//", "*", "x", "_", '"', "\n", "pub ", "Send", "#", "["]
+    # The other line breaks of str.splitlines(), and a non-breaking space.
+    pieces += ["\r", "\r\n", "\x0b", "\x0c", "\x1c", "\x85", "\u2028", "\xa0", "é"]
+    return "".join(rng.choice(pieces) for _ in range(rng.randint(0, 200)))
+
+
+@pytest.mark.parametrize("path", sorted(FIXTURE_BLOBS))
+def test_scan_blob_matches_baseline(path):
+    blob = FIXTURE_BLOBS[path]
+    assert scan_blob(blob.encode()) == baseline_scan(blob)
+
+
+def test_scan_blob_matches_baseline_on_random_lines():
+    rng = random.Random(4)
+    for _ in range(2000):
+        blob = random_blob(rng)
+        assert scan_blob(blob.encode()) == baseline_scan(blob), repr(blob)
+
+
+def test_fixtures_cover_every_type():
+    total = {t: 0 for t in TYPES}
+    for blob in FIXTURE_BLOBS.values():
+        for type_name, n in baseline_scan(blob).items():
+            total[type_name] += n
+    assert all(total.values()), total
+
+
+@pytest.fixture(scope="module")
+def fixture_repo(tmp_path_factory):
+    repo = tmp_path_factory.mktemp("repo")
+    for path, blob in FIXTURE_BLOBS.items():
+        target = repo / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(blob.encode())
+    run = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    subprocess.run([*run, "add", "."], check=True)
+    subprocess.run([*run, "commit", "-q", "-m", "fixtures"], check=True)
+    return str(repo)
+
+
+def test_count_at_matches_baseline(fixture_repo):
+    expected = baseline_count_at(fixture_repo, "HEAD")
+    assert count_at(fixture_repo, "HEAD") == expected
+    assert expected["code"] and expected["test"]
+    assert expected["code"] + expected["test"] == sum(expected[t] for t in TYPES)
+
+
+def test_single_revision_prunes_the_cache(fixture_repo, tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "cache.json")
+    cache = unsafe_count.BlobCache(cache_path)
+    cache.put("f" * 40, {t: 1 for t in TYPES})
+    cache.save()
+
+    monkeypatch.setattr(
+        "sys.argv", ["unsafe_count.py", fixture_repo, "--cache", cache_path]
+    )
+    assert unsafe_count.main() == 0
+
+    tree = {oid for oid, _ in unsafe_count.ls_tree(fixture_repo, "HEAD")}
+    assert set(unsafe_count.BlobCache(cache_path).blobs) == tree
+
+
+@pytest.fixture
+def same_date_repo(tmp_path):
+    """Two commits with the same author date, a day after a first one."""
+    repo = str(tmp_path)
+    run = ["git", "-C", repo, "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", repo], check=True)
+    for i, date in enumerate(["2024-01-01T10:00:00Z", *["2024-01-02T10:00:00Z"] * 2]):
+        (tmp_path / "lib.rs").write_text(f"unsafe {{ f({i}) }}\n" * (i + 1))
+        subprocess.run([*run, "add", "."], check=True)
+        env = {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+        subprocess.run(
+            [*run, "commit", "-q", "-m", str(i)], check=True, env={**os.environ, **env}
+        )
+    return repo
+
+
+def test_select_revisions_rejects_shared_date_keys(same_date_repo):
+    with pytest.raises(ValueError, match="2024"):
+        unsafe_count.select_revisions(same_date_repo, "HEAD", "%ad")
+    # Unique keys pass.
+    revisions = unsafe_count.select_revisions(same_date_repo, "HEAD", "%H")
+    assert len(revisions) == 3
+
+
+@pytest.mark.parametrize("option", [["--range", "HEAD"], ["--every", "2"], ["--daily"]])
+def test_incremental_rejects_range_options(option, monkeypatch, capsys):
+    argv = ["unsafe_count.py", ".", "--incremental", "unsafe-result.json", *option]
+    monkeypatch.setattr("sys.argv", argv)
+    with pytest.raises(SystemExit) as exit_info:
+        unsafe_count.main()
+    assert exit_info.value.code == 2
+    assert "--incremental" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("every", ["0", "-1"])
+def test_every_below_one(every, monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["unsafe_count.py", ".", "--every", every])
+    with pytest.raises(SystemExit) as exit_info:
+        unsafe_count.main()
+    assert exit_info.value.code == 2
+    assert "--every must be at least 1" in capsys.readouterr().err
+
+
+@pytest.fixture(scope="module")
+def history_repo(tmp_path_factory):
+    """A few commits that add, edit, delete, copy and move counted files.
+
+    Returns the repository and its commits, oldest first.
+    """
+    repo = tmp_path_factory.mktemp("history")
+    run = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    steps = [
+        # Add.
+        {
+            "src/a.rs": "unsafe { a() }\nunsafe fn f() {}\n",
+            "src/b.rs": "unsafe impl Send for B {}\n",
+            "tests/t.rs": "unsafe { t() }\n",
+            "vendor/v.rs": "unsafe { v() }\n",
+        },
+        # Edit and delete.
+        {
+            "src/a.rs": "unsafe { a() }\nunsafe { b() }\n#[unsafe(no_mangle)]\n",
+            "src/b.rs": None,
+        },
+        # Copy a file (same blob at two paths) and add a test one.
+        {
+            "src/c.rs": "unsafe { a() }\nunsafe { b() }\n#[unsafe(no_mangle)]\n",
+            "fuzz/f.rs": 'unsafe extern "C" {}\n',
+        },
+        # Move a file from the code to the tests, and empty another.
+        {"src/c.rs": None, "tests/c.rs": "unsafe trait T {}\n", "tests/t.rs": ""},
+    ]
+    shas = []
+    for i, step in enumerate(steps):
+        for path, text in step.items():
+            target = repo / path
+            if text is None:
+                target.unlink()
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text)
+        subprocess.run([*run, "add", "-A"], check=True)
+        subprocess.run([*run, "commit", "-q", "-m", str(i)], check=True)
+        shas.append(unsafe_count.git(str(repo), "rev-parse", "HEAD").strip())
+    return str(repo), shas
+
+
+def test_count_incremental_matches_count_at(history_repo):
+    repo, shas = history_repo
+    cache = unsafe_count.BlobCache()
+    for i, base in enumerate(shas):
+        base_counts = count_at(repo, base, cache)
+        for head in shas[i + 1 :]:
+            incremental = unsafe_count.count_incremental(
+                repo, base, base_counts, head, cache
+            )
+            assert incremental == count_at(repo, head), (base, head)
+
+
+def test_count_incremental_without_a_blob(history_repo, tmp_path):
+    repo, shas = history_repo
+    base_counts = count_at(repo, shas[0])
+    copy = str(tmp_path / "copy")
+    subprocess.run(["git", "clone", "-q", "--no-local", repo, copy], check=True)
+    # Unpack the objects, then lose the blob of src/a.rs at the base.
+    pack = subprocess.run(
+        ["git", "-C", copy, "rev-parse", "--git-path", "objects/pack"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    packs = list((Path(copy) / pack).glob("*.pack"))
+    for path in packs:
+        moved = path.with_suffix(".bak")
+        path.with_suffix(".idx").unlink()
+        path.rename(moved)
+        with open(moved, "rb") as f:
+            subprocess.run(
+                ["git", "-C", copy, "unpack-objects", "-q"], stdin=f, check=True
+            )
+    oid = unsafe_count.git(copy, "rev-parse", f"{shas[0]}:src/a.rs").strip()
+    (Path(copy) / ".git" / "objects" / oid[:2] / oid[2:]).unlink()
+
+    assert unsafe_count.count_incremental(copy, shas[0], base_counts, shas[-1]) is None
+    with pytest.raises(unsafe_count.MissingBlobError):
+        count_at(copy, shas[0])
+    assert count_at(copy, shas[-1]) == count_at(repo, shas[-1])
@@ -10,30 +10,21 @@ Both panels share an x-axis so trends line up vertically.
 
 import sys
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-
 from graph_common import (
+    RenderManifest,
     apply_smoothing,
+    cached_frame,
+    downsample,
+    parse_dates,
+    pyplot,
+    render_key,
+    save_figure,
+    seaborn,
     setup_theme,
     style_axes,
     style_legend,
 )
-
-if len(sys.argv) <= 1:
-    print("unsafe-graph.py: <json file>")
-    sys.exit()
-
-d = pd.read_json(sys.argv[1], orient="index")
-df = pd.DataFrame(d)
-df.columns.names = ["date"]
-df.index = pd.to_datetime(df.index, utc=True, format="mixed")
-df = df.sort_index()
-
-print(df)
-
-setup_theme()
+from instrumentation import session, span
 
 palette = {
     "total": "#0066CC",
@@ -62,6 +53,10 @@ label_map = {
 
 def plot_panel(ax, df, series, ylabel):
     """Plot total + the given series on `ax`, no area fills."""
+    import pandas as pd
+
+    sns = seaborn()
+
     cols = ["total"] + series
     df_plot = df[cols].copy().reset_index()
     df_plot.rename(columns={df_plot.columns[0]: "date"}, inplace=True)
@@ -70,21 +65,23 @@ def plot_panel(ax, df, series, ylabel):
 
     df_long = df_plot.melt(id_vars="date", var_name="series", value_name="count")
     df_long["count_smooth"] = apply_smoothing(df_long, "series", "count")
-
-    sns.lineplot(
-        data=df_long,
-        x="date",
-        y="count_smooth",
-        hue="series",
-        palette={k: palette[k] for k in cols},
-        hue_order=cols,
-        linewidth=3,
-        ax=ax,
-        markers=False,
-        dashes=False,
-        alpha=1,
-        zorder=3,
-    )
+    df_long = downsample(df_long, "date", "count_smooth", "series")
+
+    with span("lineplot"):
+        sns.lineplot(
+            data=df_long,
+            x="date",
+            y="count_smooth",
+            hue="series",
+            palette={k: palette[k] for k in cols},
+            hue_order=cols,
+            linewidth=3,
+            ax=ax,
+            markers=False,
+            dashes=False,
+            alpha=1,
+            zorder=3,
+        )
     style_axes(ax, xlabel="Date", ylabel=ylabel)
 
     handles, labels = ax.get_legend_handles_labels()
@@ -92,54 +89,83 @@ def plot_panel(ax, df, series, ylabel):
     style_legend(ax, handles, labels, ncol=len(cols), loc="upper left")
 
 
-# Drop type series that have stayed at 0 across the whole history.
-all_types = ["blocks", "extern", "attr", "fn", "impl", "trait"]
-type_series = [
-    col
-    for col in all_types
-    if col in df.columns and pd.to_numeric(df[col], errors="coerce").fillna(0).max() > 0
-]
+def parse(path):
+    import pandas as pd
 
-fig, (ax_top, ax_bot) = plt.subplots(2, 1, figsize=(18, 14), dpi=100, sharex=True)
+    d = pd.read_json(path, orient="index", convert_axes=False)
+    df = pd.DataFrame(d)
+    df.index = parse_dates(df.index)
+    return df.sort_index()
 
-plot_panel(ax_top, df, ["code", "test"], "Code vs Tests")
-plot_panel(ax_bot, df, type_series, "By keyword type")
 
-# Shared title/subtitle above the top panel.
-fig.suptitle(
-    "uutils coreutils — `unsafe` Usage Over Time",
-    fontsize=26,
-    fontweight="bold",
-    color="#1a1a1a",
-    y=0.995,
-)
-fig.text(
-    0.5,
-    0.965,
-    "Top: code vs tests/fuzz. Bottom: breakdown by `unsafe` keyword form.",
-    ha="center",
-    va="top",
-    fontsize=13,
-    color="#6B7280",
-    style="italic",
-    alpha=0.9,
-)
+def main(argv: list[str]) -> int:
+    if not argv:
+        print("unsafe-graph.py: <json file>")
+        return 0
 
-# Hide the upper panel's x-tick labels — they duplicate the lower panel's.
-plt.setp(ax_top.get_xticklabels(), visible=False)
-ax_top.set_xlabel("")
-
-plt.tight_layout(rect=[0, 0, 1, 0.94])
-
-plt.savefig(
-    "unsafe-results.svg",
-    format="svg",
-    dpi=300,
-    bbox_inches="tight",
-    facecolor="white",
-    edgecolor="none",
-    metadata={
-        "Creator": "uutils coreutils tracking",
-        "Title": "Unsafe Usage Evolution",
-    },
-)
+    df = cached_frame(argv[0], parse)
+    df.columns.names = ["date"]
+
+    print(df)
+
+    output = "unsafe-results.svg"
+    manifest = RenderManifest()
+    key = render_key(__file__, df)
+    if manifest.is_current(output, key):
+        print(f"{output} is up to date")
+        return 0
+
+    import pandas as pd
+
+    plt = pyplot()
+    setup_theme()
+
+    # Drop type series that have stayed at 0 across the whole history.
+    all_types = ["blocks", "extern", "attr", "fn", "impl", "trait"]
+    type_series = [
+        col
+        for col in all_types
+        if col in df.columns
+        and pd.to_numeric(df[col], errors="coerce").fillna(0).max() > 0
+    ]
+
+    fig, (ax_top, ax_bot) = plt.subplots(2, 1, figsize=(18, 14), dpi=100, sharex=True)
+
+    plot_panel(ax_top, df, ["code", "test"], "Code vs Tests")
+    plot_panel(ax_bot, df, type_series, "By keyword type")
+
+    # Shared title/subtitle above the top panel.
+    fig.suptitle(
+        "uutils coreutils — `unsafe` Usage Over Time",
+        fontsize=26,
+        fontweight="bold",
+        color="#1a1a1a",
+        y=0.995,
+    )
+    fig.text(
+        0.5,
+        0.965,
+        "Top: code vs tests/fuzz. Bottom: breakdown by `unsafe` keyword form.",
+        ha="center",
+        va="top",
+        fontsize=13,
+        color="#6B7280",
+        style="italic",
+        alpha=0.9,
+    )
+
+    # Hide the upper panel's x-tick labels — they duplicate the lower panel's.
+    plt.setp(ax_top.get_xticklabels(), visible=False)
+    ax_top.set_xlabel("")
+
+    plt.tight_layout(rect=[0, 0, 1, 0.94])
+
+    save_figure(fig, output, "Unsafe Usage Evolution")
+    manifest.record(output, key)
+    manifest.save()
+    return 0
+
+
+if __name__ == "__main__":
+    with session("unsafe-graph"):
+        sys.exit(main(sys.argv[1:]))
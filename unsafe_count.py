@@ -22,13 +22,43 @@ contains an `unsafe` keyword form into:
 
 A line contributes to exactly one type bucket and exactly one location bucket.
 `total = sum(types) = code + test`.
+
+Type buckets only depend on a file's contents, so they can be cached per blob
+id (`--cache`): a blob already seen at an earlier revision is not scanned
+again. The location bucket is taken from the path the blob sits at. Counting
+a single revision prunes the cache to the blobs of its tree, which are the
+ones the next `--incremental` run subtracts, so the file does not keep
+growing; counting a range keeps every blob.
+
+With `--range`, `--every` or `--daily`, many revisions are counted in one run
+(spread over a process pool) and written out as a single JSON object, which is
+how the history in unsafe-result.json gets rebuilt after a rule change. The
+entries are keyed by `--date-format`, so revisions that share a key are an
+error rather than silently overwriting each other.
+
+With `--incremental unsafe-result.json`, the last recorded entry is taken as a
+base and only the files in `git diff --raw <its sha> <--sha>` are looked at:
+their old per-blob counts are subtracted and the new ones added. If the base
+revision is not in the checkout (e.g. a shallow clone), or one of the blobs the
+diff needs cannot be read (e.g. a failed fetch in a partial clone), the whole
+tree is counted instead. A blob missing from the counted tree itself is an
+error.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import subprocess
 import sys
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from typing import Self
+
+from instrumentation import add_arguments, session, span
 
 # Each pattern is anchored on `\bunsafe` and matches the keyword followed by
 # its expected punctuation/keyword. Order matters — more specific matches
@@ -43,6 +73,40 @@ TYPE_PATTERNS: list[tuple[str, re.Pattern]] = [
 ]
 TYPES = [name for name, _ in TYPE_PATTERNS]
 
+# The characters `str.splitlines()` splits on; a line of the patterns above
+# never holds one, so neither may the whitespace of UNSAFE_TOKEN.
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_SPACE = f"[^\\S{LINE_BREAKS}]"
+
+# Every one of `TYPE_PATTERNS` in one alternation, so a blob is scanned in a
+# single `finditer` pass; `lastgroup` names the bucket of each match. The
+# keyword forms can never match at the same place as `unsafe {`, and matches
+# cannot overlap, so a line holds a match of a pattern exactly when the
+# pattern matches the line. It must stay in step with `TYPE_PATTERNS`, which
+# the tests check.
+#
+# It starts with the literal `unsafe`, so `re` looks for that string rather
+# than trying the pattern at every character; `#[` and the word boundary in
+# front of it are checked by looking back from there.
+UNSAFE_TOKEN = re.compile(
+    r"unsafe(?:(?<=#\[unsafe)\((?P<attr>)|(?<!\wunsafe)"
+    rf"(?:{_SPACE}+(?:(?P<fn>fn\b)|(?P<impl>impl\b)|(?P<trait>trait\b)"
+    rf"|(?P<extern>extern\b))|{_SPACE}*(?P<blocks>\{{)))"
+)
+# A line that starts a comment, or continues a block comment, from where the
+# line starts.
+COMMENT_LINE = re.compile(r"\s*(?://|\*)")
+# Rank of each bucket: when a line has several, the first in TYPES counts.
+TYPE_RANK = {name: rank for rank, name in enumerate(TYPES)}
+
+# Bump whenever the scanning rules change in a way `TYPE_PATTERNS` does not
+# show (e.g. which lines count as comments), so stale caches get dropped.
+SCANNER_VERSION = 1
+
+# `git diff --raw` uses the all-zero id for the missing side of an add/delete.
+NULL_OID = "0" * 40
+SUBMODULE_MODE = "160000"
+
 
 def git(repo: str, *args: str) -> str:
     return subprocess.check_output(["git", "-C", repo, *args], text=True)
@@ -53,42 +117,451 @@ def is_test_path(path: str) -> bool:
     return "tests" in parts or "fuzz" in parts
 
 
-def count_at(repo: str, sha: str) -> dict[str, int]:
+def is_counted_path(path: str) -> bool:
+    return (
+        path.endswith(".rs")
+        and not path.startswith("vendor/")
+        and "/vendor/" not in path
+        and not path.startswith("target/")
+        and "/target/" not in path
+    )
+
+
+def ls_tree(repo: str, sha: str) -> list[tuple[str, str]]:
+    """`(blob id, path)` for every counted `.rs` file in the tree at `sha`."""
+    with span("git ls-tree"):
+        out = git(repo, "ls-tree", "-r", "-z", sha)
+    entries = []
+    for record in out.split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        _mode, kind, oid = meta.split()
+        if kind == "blob" and is_counted_path(path):
+            entries.append((oid, path))
+    return entries
+
+
+class BlobReader:
+    """Stream blob contents out of one long-lived `git cat-file --batch`.
+
+    Spawning `git show` per file costs a fork/exec each; here every request
+    goes down the same pipe and comes back as a length-prefixed record:
+
+      <oid> SP blob SP <size> LF <contents> LF
+    """
+
+    def __init__(self, repo: str):
+        self.proc = subprocess.Popen(
+            ["git", "-C", repo, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        # Do not hide the error that ended the block behind git's exit status.
+        self.close(check=exc_type is None)
+
+    def close(self, check: bool = True) -> None:
+        """Stop git; raise CalledProcessError if it failed and `check` is set."""
+        if self.proc.stdin and not self.proc.stdin.closed:
+            self.proc.stdin.close()
+        self.proc.stdout.close()
+        status = self.proc.wait()
+        if check and status:
+            raise subprocess.CalledProcessError(status, self.proc.args)
+
+    def read(self, oids: Iterable[str]) -> Iterator[tuple[str, bytes | None]]:
+        """Yield `(oid, contents)` in request order; `None` for missing ones."""
+        oids = list(oids)
+        # Feed the requests from a separate thread: writing them all up front
+        # from here would deadlock once git blocks on a full stdout pipe.
+        feeder = threading.Thread(target=self._request, args=(oids,), daemon=True)
+        feeder.start()
+        stdout = self.proc.stdout
+        for oid in oids:
+            header = stdout.readline().split()
+            if len(header) != 3:
+                # `<oid> missing` / `<oid> ambiguous`
+                yield oid, None
+                continue
+            size = int(header[2])
+            data = stdout.read(size)
+            stdout.read(1)  # trailing LF
+            yield oid, data
+        feeder.join()
+
+    def _request(self, oids: list[str]) -> None:
+        stdin = self.proc.stdin
+        for oid in oids:
+            stdin.write(f"{oid}\n".encode())
+        stdin.flush()
+
+
+def scan_blob(data: bytes) -> dict[str, int]:
+    """Per-type counts for one `.rs` blob.
+
+    Each line holding an `unsafe` form that is not a comment counts once, in
+    the bucket of the first of its patterns in TYPE_PATTERNS. Blobs without
+    the keyword, most of them, are skipped before any regex runs; the others
+    take one pass of UNSAFE_TOKEN, and only the lines it matches are looked
+    at again.
+    """
     counts = {t: 0 for t in TYPES}
-    counts["code"] = 0
-    counts["test"] = 0
-
-    files = git(repo, "ls-tree", "-r", "--name-only", sha).splitlines()
-    rs_files = [
-        f
-        for f in files
-        if f.endswith(".rs")
-        and not f.startswith("vendor/")
-        and "/vendor/" not in f
-        and not f.startswith("target/")
-        and "/target/" not in f
-    ]
-    if not rs_files:
+    if b"unsafe" not in data:
         return counts
+    text = data.decode("utf-8", errors="replace")
+    # Mostly just "\n"; a "\r\n" line starts after its "\n" either way.
+    breaks = [c for c in LINE_BREAKS if c in text]
+    # Line start to the rank of the best bucket matched on the line.
+    best: dict[int, int] = {}
+    for match in UNSAFE_TOKEN.finditer(text):
+        pos = match.start()
+        start = max([text.rfind(c, 0, pos) for c in breaks], default=-1) + 1
+        rank = TYPE_RANK[match.lastgroup]
+        if rank < best.get(start, len(TYPES)):
+            best[start] = rank
+    for start, rank in best.items():
+        # The match is on the line, so the leading whitespace ends before it.
+        if not COMMENT_LINE.match(text, start):
+            counts[TYPES[rank]] += 1
+    return counts
 
-    for path in rs_files:
-        location = "test" if is_test_path(path) else "code"
-        try:
-            blob = git(repo, "show", f"{sha}:{path}")
-        except subprocess.CalledProcessError:
-            continue
-        for line in blob.splitlines():
-            stripped = line.lstrip()
-            if stripped.startswith(("//", "*")):
+
+def scanner_fingerprint() -> str:
+    """Identify the scanning rules a cached result was produced with."""
+    rules = [str(SCANNER_VERSION)] + [f"{n}={r.pattern}" for n, r in TYPE_PATTERNS]
+    return hashlib.sha1("\n".join(rules).encode()).hexdigest()[:12]
+
+
+class BlobCache:
+    """Per-blob type counts keyed by git object id, persisted as JSON.
+
+    The file holds one `"<oid>": [n, ...]` line per blob, with counts in
+    `TYPES` order, so new blobs show up as one-line additions in git diffs.
+    A cache written with different scanning rules is ignored and rebuilt.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.blobs: dict[str, list[int]] = {}
+        # Blob ids added since the last `take_new()`, so worker processes can
+        # ship only their additions back to the parent.
+        self.new: set[str] = set()
+        self.dirty = False
+        # Whether an existing cache file was dropped for having been written
+        # by different scanning rules.
+        self.stale = False
+        if path and os.path.exists(path):
+            with span("blob cache load"), open(path) as f:
+                data = json.load(f)
+            current = data.get("scanner") == scanner_fingerprint()
+            if current and data.get("types") == list(TYPES):
+                self.blobs = data["blobs"]
+            else:
+                self.stale = True
+
+    def __contains__(self, oid: str) -> bool:
+        return oid in self.blobs
+
+    def get(self, oid: str) -> dict[str, int]:
+        return dict(zip(TYPES, self.blobs[oid], strict=True))
+
+    def put(self, oid: str, counts: dict[str, int]) -> None:
+        self.blobs[oid] = [counts[t] for t in TYPES]
+        self.new.add(oid)
+        self.dirty = True
+
+    def take_new(self) -> dict[str, list[int]]:
+        new = {oid: self.blobs[oid] for oid in self.new}
+        self.new.clear()
+        return new
+
+    def update(self, blobs: dict[str, list[int]]) -> None:
+        if blobs:
+            self.blobs.update(blobs)
+            self.dirty = True
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Forget every blob that is not among `keep`."""
+        keep = set(keep)
+        kept = {oid: counts for oid, counts in self.blobs.items() if oid in keep}
+        if len(kept) != len(self.blobs):
+            self.blobs = kept
+            self.new &= keep
+            self.dirty = True
+
+    @span("blob cache save")
+    def save(self) -> None:
+        if not self.path or not self.dirty:
+            return
+        lines = [
+            f"    {json.dumps(oid)}: {json.dumps(self.blobs[oid])}"
+            for oid in sorted(self.blobs)
+        ]
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            f.write("{\n")
+            f.write(f'  "scanner": {json.dumps(scanner_fingerprint())},\n')
+            f.write(f'  "types": {json.dumps(list(TYPES))},\n')
+            f.write('  "blobs": {\n')
+            f.write(",\n".join(lines))
+            f.write("\n  }\n}\n")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class MissingBlobError(LookupError):
+    """A blob that a count needs is not in the repository.
+
+    In a partial (`blob:none`) clone, that is a blob git failed to fetch.
+    """
+
+
+def fill_cache(repo: str, oids: Iterable[str], cache: BlobCache) -> None:
+    """Scan the blobs among `oids` that `cache` does not know yet.
+
+    Raises:
+        MissingBlobError: if git cannot read one of them; a count that left
+            the blob out would be silently wrong
+    """
+    wanted = [oid for oid in oids if oid not in cache]
+    if not wanted:
+        return
+    missing = []
+    with BlobReader(repo) as reader:
+        blobs = reader.read(wanted)
+        while True:
+            with span("blob reads"):
+                item = next(blobs, None)
+            if item is None:
+                break
+            oid, data = item
+            if data is None:
+                missing.append(oid)
                 continue
-            for type_name, regex in TYPE_PATTERNS:
-                if regex.search(line):
-                    counts[type_name] += 1
-                    counts[location] += 1
-                    break
+            with span("regex scan"):
+                counts = scan_blob(data)
+            cache.put(oid, counts)
+    if missing:
+        raise MissingBlobError(
+            f"{repo}: {len(missing)} blob(s) cannot be read, e.g. {missing[0]}"
+        )
+
+
+def empty_counts() -> dict[str, int]:
+    return {**{t: 0 for t in TYPES}, "code": 0, "test": 0}
+
+
+def add_blob(
+    counts: dict[str, int], blob_counts: dict[str, int], path: str, sign: int = 1
+) -> None:
+    """Add (or with `sign=-1`, remove) one file's counts to `counts`."""
+    location = "test" if is_test_path(path) else "code"
+    for type_name, n in blob_counts.items():
+        counts[type_name] += sign * n
+    counts[location] += sign * sum(blob_counts.values())
+
+
+def count_at(repo: str, sha: str, cache: BlobCache | None = None) -> dict[str, int]:
+    counts = empty_counts()
+
+    entries = ls_tree(repo, sha)
+    if not entries:
+        return counts
+
+    if cache is None:
+        cache = BlobCache()
+    fill_cache(repo, (oid for oid, _ in entries), cache)
+
+    # Identical files share one blob id; count each path separately.
+    for oid, path in entries:
+        add_blob(counts, cache.get(oid), path)
+    return counts
+
+
+def has_commit(repo: str, sha: str) -> bool:
+    check = subprocess.run(
+        ["git", "-C", repo, "cat-file", "-e", f"{sha}^{{commit}}"],
+        capture_output=True,
+        check=False,
+    )
+    return check.returncode == 0
+
+
+def count_incremental(
+    repo: str,
+    base_sha: str,
+    base_counts: dict[str, int],
+    sha: str,
+    cache: BlobCache | None = None,
+) -> dict[str, int] | None:
+    """Counts at `sha`, derived from `base_counts` recorded at `base_sha`.
+
+    Only the files changed between the two revisions are looked at: each
+    changed path gives back the counts of its old blob and takes those of
+    its new one. Returns None when `base_sha` or one of those blobs is not
+    available, as the result would be wrong, and wrong in every later entry
+    counted from this one.
+    """
+    if not has_commit(repo, base_sha):
+        return None
+
+    with span("git diff"):
+        raw = git(
+            repo, "diff", "--raw", "-z", "--no-renames", "--no-abbrev", base_sha, sha
+        )
+    # -z output: ":<old mode> <new mode> <old oid> <new oid> <status>\0<path>\0"
+    fields = raw.split("\0")
+    changes = []
+    for meta, path in zip(fields[0::2], fields[1::2], strict=False):
+        if not meta or not is_counted_path(path):
+            continue
+        old_mode, new_mode, old_oid, new_oid, _status = meta.lstrip(":").split()
+        # Submodule entries point at commits, not blobs; `ls_tree` skips them.
+        if old_oid != NULL_OID and old_mode != SUBMODULE_MODE:
+            changes.append((old_oid, path, -1))
+        if new_oid != NULL_OID and new_mode != SUBMODULE_MODE:
+            changes.append((new_oid, path, 1))
+
+    if cache is None:
+        cache = BlobCache()
+    try:
+        fill_cache(repo, (oid for oid, _, _ in changes), cache)
+    except MissingBlobError:
+        return None
+
+    counts = dict(base_counts)
+    for oid, path, sign in changes:
+        add_blob(counts, cache.get(oid), path, sign)
     return counts
 
 
+def last_entry(path: str) -> tuple[str, dict[str, int]]:
+    """`(sha, counts)` of the last entry of a result file.
+
+    merge_results.py keeps the entries sorted by date, so that is the one with
+    the latest (author) date, which is not always the last one counted. Any
+    entry is a valid base for --incremental, as the diff is between trees.
+    """
+    with open(path) as f:
+        results = json.load(f)
+    entry = list(results.values())[-1]
+    return entry["sha"], {k: int(entry[k]) for k in [*TYPES, "code", "test"]}
+
+
+def make_entry(sha: str, counts: dict[str, int]) -> dict[str, str]:
+    return {
+        "sha": sha,
+        "total": str(counts["code"] + counts["test"]),
+        "code": str(counts["code"]),
+        "test": str(counts["test"]),
+        **{t: str(counts[t]) for t in TYPES},
+    }
+
+
+def select_revisions(
+    repo: str,
+    rev_range: str,
+    date_format: str,
+    every: int = 1,
+    daily: bool = False,
+) -> list[tuple[str, str]]:
+    """`(sha, date key)` for the first-parent revisions to count, oldest first.
+
+    `daily` keeps the last commit of each UTC day; `every` then keeps every
+    Nth of the remaining ones. The newest revision is always kept so the
+    series ends at the tip of the range.
+
+    Raises:
+        ValueError: if two of the revisions get the same date key, as one
+            would overwrite the other in the output
+    """
+    with span("git log"):
+        log = git(
+            repo,
+            "log",
+            "--first-parent",
+            "--reverse",
+            f"--format=%H%x1f%ct%x1f{date_format}",
+            rev_range,
+        )
+    revisions = [line.split("\x1f", 2) for line in log.splitlines() if line]
+    if daily:
+        by_day: dict[str, list[str]] = {}
+        for rev in revisions:
+            day = datetime.fromtimestamp(int(rev[1]), UTC).date().isoformat()
+            by_day[day] = rev
+        revisions = list(by_day.values())
+    picked = revisions[::every]
+    if revisions and picked[-1] is not revisions[-1]:
+        picked.append(revisions[-1])
+
+    shas_by_key: dict[str, list[str]] = {}
+    for sha, _, date in picked:
+        shas_by_key.setdefault(date, []).append(sha)
+    duplicates = {key: shas for key, shas in shas_by_key.items() if len(shas) > 1}
+    if duplicates:
+        key, shas = next(iter(duplicates.items()))
+        raise ValueError(
+            f"revisions share {len(duplicates)} date key(s), e.g. {key!r}: "
+            f"{', '.join(sha[:12] for sha in shas)}; use --daily or a finer "
+            "--date-format"
+        )
+    return [(sha, date) for sha, _, date in picked]
+
+
+# Per-process cache for the backfill pool, loaded once by `_init_worker`.
+_worker_cache: BlobCache | None = None
+
+
+def _init_worker(cache_path: str | None) -> None:
+    global _worker_cache
+    _worker_cache = BlobCache(cache_path)
+
+
+def _count_chunk(
+    repo: str, shas: list[str]
+) -> tuple[list[dict[str, int]], dict[str, list[int]]]:
+    counts = [count_at(repo, sha, _worker_cache) for sha in shas]
+    return counts, _worker_cache.take_new()
+
+
+def count_many(
+    repo: str,
+    shas: list[str],
+    cache: BlobCache,
+    jobs: int | None = None,
+) -> list[dict[str, int]]:
+    """`count_at` for each of `shas`, spread over a process pool.
+
+    Each worker gets runs of consecutive revisions, which share most of their
+    blobs, so its own copy of the cache stays warm. The blobs scanned by the
+    workers are merged back into `cache`.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(shas) <= 1:
+        return [count_at(repo, sha, cache) for sha in shas]
+
+    n_chunks = min(len(shas), jobs * 4)
+    size = -(-len(shas) // n_chunks)
+    chunks = [shas[i : i + size] for i in range(0, len(shas), size)]
+    results: list[dict[str, int]] = []
+    with (
+        span("count pool"),
+        ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(cache.path,)
+        ) as pool,
+    ):
+        for counts, new_blobs in pool.map(_count_chunk, [repo] * len(chunks), chunks):
+            results.extend(counts)
+            cache.update(new_blobs)
+    return results
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("repo", help="path to a uutils/coreutils git checkout")
@@ -102,22 +575,99 @@ def main() -> int:
         default="%ad",
         help="git format string for the JSON key (default: %%ad — RFC2822-ish)",
     )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="JSON file of per-blob counts to reuse across runs",
+    )
+    parser.add_argument(
+        "--range",
+        default=None,
+        help="count every first-parent commit in this git revision range "
+        "(e.g. `v0.0.1..HEAD`; default with --every/--daily: --sha)",
+    )
+    parser.add_argument(
+        "--every",
+        type=int,
+        default=None,
+        metavar="N",
+        help="only count every Nth commit of the range",
+    )
+    parser.add_argument(
+        "--daily",
+        action="store_true",
+        help="only count the last commit of each day of the range",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes for --range/--every/--daily (default: CPU count)",
+    )
+    parser.add_argument(
+        "--incremental",
+        default=None,
+        metavar="RESULT_JSON",
+        help="count --sha by applying the diff since the last entry of this file",
+    )
+    add_arguments(parser)
     args = parser.parse_args()
+    if args.every is not None and args.every < 1:
+        parser.error(f"--every must be at least 1, got {args.every}")
+    if args.incremental and (
+        args.range is not None or args.every is not None or args.daily
+    ):
+        parser.error("--incremental cannot be used with --range, --every or --daily")
 
-    sha = git(args.repo, "rev-parse", args.sha).strip()
-    date = git(args.repo, "show", "-s", f"--format={args.date_format}", sha).strip()
+    with session("unsafe_count", args.profile, args.timings):
+        cache = BlobCache(args.cache)
+        if args.range is None and args.every is None and not args.daily:
+            sha = git(args.repo, "rev-parse", args.sha).strip()
+            date = git(args.repo, "show", "-s", f"--format={args.date_format}", sha)
+            revisions = [(sha, date.strip())]
+            result = None
+            # The recorded counts are only a valid base while the scanning rules
+            # they were made with are still the ones in use.
+            if args.incremental and not cache.stale:
+                base_sha, base_counts = last_entry(args.incremental)
+                result = count_incremental(args.repo, base_sha, base_counts, sha, cache)
+                if result is None:
+                    print(
+                        f"cannot count from {base_sha[:12]}, counting the whole tree",
+                        file=sys.stderr,
+                    )
+            if result is None:
+                try:
+                    result = count_at(args.repo, sha, cache)
+                except MissingBlobError as e:
+                    print(e, file=sys.stderr)
+                    return 1
+            counts = [result]
+            if args.cache:
+                cache.prune(oid for oid, _ in ls_tree(args.repo, sha))
+        else:
+            try:
+                revisions = select_revisions(
+                    args.repo,
+                    args.range or args.sha,
+                    args.date_format,
+                    every=args.every or 1,
+                    daily=args.daily,
+                )
+            except ValueError as e:
+                print(f"{args.repo}: {e}", file=sys.stderr)
+                return 1
+            shas = [sha for sha, _ in revisions]
+            counts = count_many(args.repo, shas, cache, args.jobs)
+        cache.save()
 
-    counts = count_at(args.repo, sha)
-    entry = {
-        "sha": sha,
-        "total": str(counts["code"] + counts["test"]),
-        "code": str(counts["code"]),
-        "test": str(counts["test"]),
-        **{t: str(counts[t]) for t in TYPES},
-    }
-    json.dump({date: entry}, sys.stdout, indent=2)
-    sys.stdout.write("\n")
-    return 0
+        result = {
+            date: make_entry(sha, c)
+            for (sha, date), c in zip(revisions, counts, strict=True)
+        }
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
 
 
 if __name__ == "__main__":